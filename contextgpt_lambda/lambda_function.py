@@ -1,8 +1,36 @@
+import base64
 import json
+import logging
 import os
-import requests
+import time
+
+# OpenAI-compatible chat completions endpoint
+OPENAI_API_URL = os.environ.get('OPENAI_API_URL', 'https://api.openai.com/v1/chat/completions')
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 2))
+OPENAI_READ_TIMEOUT = float(os.environ.get('OPENAI_READ_TIMEOUT', 30))
+# Kept back from the Lambda timeout to answer once the OpenAI call gives up
+DEADLINE_RESERVE_MS = int(os.environ.get('DEADLINE_RESERVE_MS', 500))
+DEADLINE_MIN_CALL_MS = int(os.environ.get('DEADLINE_MIN_CALL_MS', 200))
+
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+def degraded_response(headers):
+    """
+    Quick 503 telling the client to retry, instead of running into the
+    Lambda timeout and an API Gateway 502
+    """
+    return {
+        'statusCode': 503,
+        'headers': dict(headers, **{'Retry-After': '2'}),
+        'body': json.dumps({'error': 'The service is busy, please try again', 'degraded': True})
+    }
 
 def lambda_handler(event, context):
+    # Deadline of the OpenAI call, from the invocation's remaining time
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    deadline = time.monotonic() + ((get_remaining() if get_remaining else 30000) - DEADLINE_RESERVE_MS) / 1000
+
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": event.get('headers', {}).get('origin', 'http://localhost:5173'),  # Dynamically set origin
@@ -10,8 +38,9 @@ def lambda_handler(event, context):
         "Access-Control-Allow-Methods": "OPTIONS,POST"
     }
 
-    # Debug logging
-    print("Event received:", json.dumps(event))
+    # Debug logging, serialized only when enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Event received: %s", json.dumps(event))
     
     # Handle OPTIONS request (preflight)
     if event.get("httpMethod") == "OPTIONS":
@@ -26,11 +55,11 @@ def lambda_handler(event, context):
         request_api_key = event.get('headers', {}).get('x-api-key')
         expected_api_key = os.environ.get('API_GATEWAY_KEY')
         
-        print("Request API Key present:", bool(request_api_key))
-        print("Expected API Key present:", bool(expected_api_key))
+        logger.debug("Request API Key present: %s", bool(request_api_key))
+        logger.debug("Expected API Key present: %s", bool(expected_api_key))
         
         if not request_api_key or request_api_key != expected_api_key:
-            print("API Key verification failed")
+            logger.warning("API Key verification failed")
             return {
                 'statusCode': 403,
                 'headers': headers,
@@ -50,7 +79,12 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'No body provided'})
             }
 
-        body = json.loads(event['body'])
+        raw_body = event['body']
+        if event.get('isBase64Encoded'):
+            # */* is a binary media type on the REST API, so API Gateway
+            # hands request bodies over base64 encoded
+            raw_body = base64.b64decode(raw_body).decode('utf-8')
+        body = json.loads(raw_body)
         question_context = body.get('questionContext', {})
         chat_history = body.get('chatHistory', [])
         user_message = body.get('userMessage', '')
@@ -74,19 +108,32 @@ def lambda_handler(event, context):
             "content": user_message
         })
 
-        openai_response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-3.5-turbo",
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 150
-            }
-        )
+        # Imported here so preflights and rejected requests skip its import
+        import requests
+
+        budget = deadline - time.monotonic()
+        if budget * 1000 < DEADLINE_MIN_CALL_MS:
+            logger.warning("Deadline reached before the OpenAI call")
+            return degraded_response(headers)
+
+        try:
+            openai_response = requests.post(
+                OPENAI_API_URL,
+                headers={
+                    "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "gpt-3.5-turbo",
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": 150
+                },
+                timeout=(min(OPENAI_CONNECT_TIMEOUT, budget), min(OPENAI_READ_TIMEOUT, budget))
+            )
+        except requests.Timeout as e:
+            logger.warning("OpenAI call timed out: %s", e)
+            return degraded_response(headers)
 
         if not openai_response.ok:
             return {
@@ -105,7 +152,7 @@ def lambda_handler(event, context):
         }
 
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
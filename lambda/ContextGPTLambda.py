@@ -1,7 +1,19 @@
 import json
 import os
-import requests
+import chat_history as history
+import deadline
+from response_compression import compressed
+import telemetry
+import tutor_cache
+import tutor_client
+import tutor_prompt
 
+# Open the OpenAI connection during init so warm chat turns reuse it
+tutor_client.prewarm()
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
     # Define allowed origins
     allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
@@ -31,14 +43,16 @@ def lambda_handler(event, context):
 
     try:
         # API key verification with debug logging
-        request_api_key = event.get('headers', {}).get('x-api-key')
-        expected_api_key = os.environ.get('API_GATEWAY_KEY')
-        
-        print("Request API Key present:", bool(request_api_key))
-        print("Expected API Key present:", bool(expected_api_key))
+        with telemetry.phase('auth'):
+            request_api_key = event.get('headers', {}).get('x-api-key')
+            expected_api_key = os.environ.get('API_GATEWAY_KEY')
+            authorized = bool(request_api_key) and request_api_key == expected_api_key
+
+        telemetry.debug("Request API Key present: %s", bool(request_api_key))
+        telemetry.debug("Expected API Key present: %s", bool(expected_api_key))
         
-        if not request_api_key or request_api_key != expected_api_key:
-            print("API Key verification failed")
+        if not authorized:
+            telemetry.logger.warning("API Key verification failed")
             return {
                 'statusCode': 403,
                 'headers': headers,
@@ -58,62 +72,88 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'No body provided'})
             }
 
-        body = json.loads(event['body'])
-        question_context = body.get('questionContext', {})
-        chat_history = body.get('chatHistory', [])
-        user_message = body.get('userMessage', '')
-
-        messages = [
-            {
-                "role": "system",
-                "content": f"You are a helpful AI tutor. Use the following question context to help the user understand the topic better: "
-                           f"Question: {question_context.get('question_text')}\n"
-                           f"Options:\nA) {question_context.get('option_a')}\n"
-                           f"B) {question_context.get('option_b')}\n"
-                           f"C) {question_context.get('option_c')}\n"
-                           f"D) {question_context.get('option_d')}\n"
-                           f"User selected: {question_context.get('selected_answer')}\n"
-                           f"Correct answer: {question_context.get('correct_answer')}"
+        # Oversized conversations are refused before anything leaves the container
+        if history.body_too_large(event):
+            return {
+                'statusCode': 413,
+                'headers': headers,
+                'body': json.dumps({'error': 'Request body too large'})
             }
-        ]
-        messages.extend(chat_history)
-        messages.append({
-            "role": "user",
-            "content": user_message
-        })
-
-        openai_response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-3.5-turbo",
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 150
+
+        try:
+            with telemetry.phase('parse'):
+                body = json.loads(event['body'])
+                question_context, chat_history, user_message = history.parse_request(body)
+                # Skip the cache read (the fresh answer still replaces the entry)
+                bypass_cache = body.get('bypassCache') is True
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
             }
-        )
 
-        if not openai_response.ok:
+        # Repeated questions about the same question and answer are served
+        # from the in-container or shared answer cache
+        cache = tutor_cache.get_cache()
+        key = tutor_cache.cache_key(question_context, user_message, chat_history) if cache else None
+        cached, tier = None, None
+        if cache and not bypass_cache:
+            with telemetry.phase('cache'):
+                cached, tier = cache.get(key)
+            telemetry.count('TutorCacheHit', int(cached is not None))
+        telemetry.annotate(tutorCache=tier or ('bypass' if bypass_cache or not cache else 'miss'))
+
+        if cached is not None:
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps({'response': cached})
+            }
+
+        # Keep the prompt inside the token budget: recent turns verbatim,
+        # older ones collapsed into a digest
+        with telemetry.phase('compact'):
+            try:
+                messages, tokens, dropped = history.compact(question_context, chat_history, user_message)
+            except history.PromptTooLarge as e:
+                return {
+                    'statusCode': 413,
+                    'headers': headers,
+                    'body': json.dumps({'error': str(e)})
+                }
+        telemetry.count('CompactedTurns', dropped)
+        telemetry.annotate(promptTokens=tokens)
+
+        # Pooled keep-alive connection shared by every invocation of the container
+        with telemetry.phase('upstream'):
+            openai_response = tutor_client.get_client().post(tutor_prompt.completion_request(messages))
+
+        if openai_response.status != 200:
             return {
-                'statusCode': openai_response.status_code,
+                'statusCode': openai_response.status,
                 'headers': headers,
-                'body': json.dumps({'error': f'OpenAI API error: {openai_response.text}'})
+                'body': json.dumps({'error': f'OpenAI API error: {openai_response.data.decode("utf-8")}'})
             }
 
-        response_data = openai_response.json()
-        ai_response = response_data['choices'][0]['message']['content']
+        with telemetry.phase('serialize'):
+            response_data = json.loads(openai_response.data)
+            ai_response = response_data['choices'][0]['message']['content']
+            response_body = json.dumps({'response': ai_response})
+        if cache:
+            cache.put(key, ai_response)
 
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({'response': ai_response})
+            'body': response_body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
-        print(f"Error: {str(e)}")
+        telemetry.logger.error("Error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
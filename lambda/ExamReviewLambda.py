@@ -0,0 +1,239 @@
+import contextvars
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import chat_history as history
+import deadline
+from response_compression import compressed
+import telemetry
+import tutor_cache
+import tutor_client
+import tutor_prompt
+
+# Tutor calls in flight per invocation; the tutor client's pool is sized
+# to match, so every worker keeps its own pooled connection
+WORKERS = int(os.environ.get('EXAM_REVIEW_WORKERS', 8))
+# Longest exam is 90 questions
+MAX_QUESTIONS = int(os.environ.get('EXAM_REVIEW_MAX_QUESTIONS', 100))
+MAX_BODY_BYTES = int(os.environ.get('EXAM_REVIEW_MAX_BODY_BYTES', 512 * 1024))
+# Asked about every missed question; an opening message, so pregenerated
+# answers are cache hits
+REVIEW_MESSAGE = tutor_prompt.OPENING_MESSAGES[0]
+
+tutor_client.reserve(WORKERS)
+# Open the OpenAI connection during init so the first review reuses it
+tutor_client.prewarm()
+
+_executor = None
+
+
+def executor():
+    """
+    Worker pool kept for the life of the container
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS)
+    return _executor
+
+
+def missed_questions(questions, answers):
+    """
+    (index, question, selected letter) for each wrong answer. answers is a
+    list, or an object keyed by question index, as the exam page keeps it.
+    Raises ValueError for input of any other shape.
+    """
+    if not isinstance(questions, list) or not isinstance(answers, (list, dict)):
+        raise ValueError("questions must be a list and answers a list or object")
+    missed = []
+    for index, question in enumerate(questions):
+        selected = answers.get(str(index)) if isinstance(answers, dict) else (
+            answers[index] if index < len(answers) else None
+        )
+        if not isinstance(question, dict):
+            raise ValueError(f"Question {index} must be an object")
+        if selected is not None and not isinstance(selected, str):
+            raise ValueError(f"Answer {index} must be a string")
+        correct = question.get('correct answer') or ''
+        if not isinstance(correct, str):
+            raise ValueError(f"Question {index} has a non-string correct answer")
+        if (selected or '').upper() != correct.upper():
+            missed.append((index, question, selected))
+    return missed
+
+
+def explain(cache, bypass_cache, index, question, selected):
+    """
+    Review entry for one missed question, from the answer cache when it
+    has one
+    """
+    entry = {
+        'index': index,
+        'id': question.get('id'),
+        'selectedAnswer': selected,
+        'correctAnswer': question.get('correct answer')
+    }
+    context = tutor_prompt.question_context(question, selected)
+    key = tutor_cache.cache_key(context, REVIEW_MESSAGE, []) if cache else None
+    if cache and not bypass_cache:
+        cached, _ = cache.get(key)
+        if cached is not None:
+            return dict(entry, response=cached, cached=True)
+
+    messages, _, _ = history.compact(context, [], REVIEW_MESSAGE)
+    openai_response = tutor_client.get_client().post(tutor_prompt.completion_request(messages))
+    if openai_response.status != 200:
+        return dict(entry, error=f'OpenAI API error {openai_response.status}')
+
+    answer = json.loads(openai_response.data)['choices'][0]['message']['content']
+    if cache:
+        cache.put(key, answer)
+    return dict(entry, response=answer, cached=False)
+
+
+def review(missed, bypass_cache):
+    """
+    Yield review entries as they complete, at most WORKERS tutor calls at
+    a time, until every question is explained or the deadline is near.
+    Questions left over are yielded as {'index': ..., 'pending': true} for
+    the client to send again; those already explained are cache hits then.
+    """
+    cache = tutor_cache.get_cache()
+    pool = executor()
+    # Each task gets a copy of the invocation's deadline and telemetry
+    futures = {
+        pool.submit(contextvars.copy_context().run, explain, cache, bypass_cache, index, question, selected): index
+        for index, question, selected in missed
+    }
+    pending = set(futures)
+    while pending:
+        current = deadline.current()
+        done, pending = wait(pending, timeout=current and current.remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                entry = future.result()
+                if 'cached' in entry:
+                    telemetry.count('TutorCacheHit', int(entry['cached']))
+                yield entry
+            except deadline.DeadlineExceeded:
+                yield {'index': futures[future], 'pending': True}
+            except Exception as e:
+                telemetry.logger.error("Review of question %s failed: %s", futures[future], e)
+                yield {'index': futures[future], 'error': str(e)}
+
+    for future in pending:
+        # Queued calls are dropped; running ones time out with the deadline
+        future.cancel()
+        yield {'index': futures[future], 'pending': True}
+
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
+def lambda_handler(event, context):
+    # Define allowed origins
+    allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
+
+    # Get the origin from the request headers
+    origin = event.get('headers', {}).get('origin', '')
+
+    # Set CORS headers
+    headers = {
+        "Content-Type": "application/json",
+        "Access-Control-Allow-Headers": "Content-Type,X-Api-Key,x-api-key,Origin",
+        "Access-Control-Allow-Methods": "OPTIONS,POST",
+        "Access-Control-Allow-Credentials": "false"
+    }
+
+    # Set Allow-Origin if origin is in allowed list
+    if origin in allowed_origins:
+        headers["Access-Control-Allow-Origin"] = origin
+
+    # Handle OPTIONS request (preflight)
+    if event.get("httpMethod") == "OPTIONS":
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({'message': 'CORS preflight success'})
+        }
+
+    try:
+        with telemetry.phase('auth'):
+            request_api_key = event.get('headers', {}).get('x-api-key')
+            expected_api_key = os.environ.get('API_GATEWAY_KEY')
+            authorized = bool(request_api_key) and request_api_key == expected_api_key
+
+        if not authorized:
+            telemetry.logger.warning("API Key verification failed")
+            return {
+                'statusCode': 403,
+                'headers': headers,
+                'body': json.dumps({'error': 'Unauthorized'})
+            }
+
+        if not event.get('body'):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'No body provided'})
+            }
+
+        if history.body_too_large(event, MAX_BODY_BYTES):
+            return {
+                'statusCode': 413,
+                'headers': headers,
+                'body': json.dumps({'error': 'Request body too large'})
+            }
+
+        try:
+            with telemetry.phase('parse'):
+                body = json.loads(event['body'])
+                if not isinstance(body, dict):
+                    raise ValueError("Body must be a JSON object")
+                questions = body.get('questions') or []
+                answers = body.get('answers') or []
+                bypass_cache = body.get('bypassCache') is True
+                missed = missed_questions(questions, answers)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+
+        if len(questions) > MAX_QUESTIONS:
+            return {
+                'statusCode': 413,
+                'headers': headers,
+                'body': json.dumps({'error': f'At most {MAX_QUESTIONS} questions per review'})
+            }
+
+        telemetry.count('ReviewQuestions', len(missed))
+
+        with telemetry.phase('upstream'):
+            entries = sorted(review(missed, bypass_cache), key=lambda entry: entry['index'])
+
+        with telemetry.phase('serialize'):
+            response_body = json.dumps({
+                'explanations': [entry for entry in entries if not entry.get('pending')],
+                'pending': [entry['index'] for entry in entries if entry.get('pending')]
+            })
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': response_body
+        }
+
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
+    except Exception as e:
+        telemetry.logger.error("Error: %s", e)
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
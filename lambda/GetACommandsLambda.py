@@ -1,22 +1,28 @@
 import json
-import random
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+import deadline
+import drill_tables
+import question_snapshot
+from question_json import dumps_questions
+from question_cursor import CURSOR_HEADER
+from response_compression import compressed
+import telemetry
 
-# Converts DynamoDB decimals to float in JSON
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Formatted questions per question-type, kept across warm invocations
+partitions = drill_tables.PARTITIONS['Commands']
 
+# Map the bundled snapshot during init
+question_snapshot.preload(['Commands'])
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "OPTIONS,GET,POST",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization"
+        "Access-Control-Allow-Headers": "Content-Type, Authorization",
+        "Access-Control-Expose-Headers": CURSOR_HEADER
     }
 
     # Handle CORS preflight
@@ -27,61 +33,49 @@ def lambda_handler(event, context):
             "body": ""
         }
 
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table('Commands')
-
     try:
-        print("Attempting to query DynamoDB table 'Commands'")
-
-        # Accept type from query params or JSON body
-        if "queryStringParameters" in event and event["queryStringParameters"]:
-            question_type = event["queryStringParameters"].get("type", "command_to_description")
-        elif "body" in event and event["body"]:
-            body = json.loads(event["body"])
-            question_type = body.get("type", "command_to_description")
-        else:
-            question_type = "command_to_description"
+        # Accept type and cursor from query params or JSON body
+        with telemetry.phase('parse'):
+            if "queryStringParameters" in event and event["queryStringParameters"]:
+                params = event["queryStringParameters"]
+            elif "body" in event and event["body"]:
+                params = json.loads(event["body"])
+            else:
+                params = {}
+            question_type = params.get("type", "command_to_description")
 
-        print(f"Querying for question type: {question_type}")
+        telemetry.annotate(questionType=question_type)
 
-        response = table.query(
-            KeyConditionExpression=Key('question-type').eq(question_type)
-        )
+        # Next unseen question of the client's cursor, or a random one
+        # when no cursor was sent
+        with telemetry.phase('storage'):
+            questions, next_cursor = partitions.next_unseen('Commands', question_type, params.get("cursor"))
 
-        if not response['Items']:
+        if not questions:
             return {
                 'statusCode': 404,
                 'headers': headers,
                 'body': json.dumps('No questions found for the specified type')
             }
 
-        selected_question = random.choice(response['Items'])
+        formatted_question = questions[0]
+        headers[CURSOR_HEADER] = next_cursor
 
-        formatted_question = {
-            'question-text': selected_question['question-text'],
-            'option-a': selected_question['option-a'],
-            'option-b': selected_question['option-b'],
-            'option-c': selected_question['option-c'],
-            'option-d': selected_question['option-d'],
-            'explanation-a': selected_question['explanation-a'],
-            'explanation-b': selected_question['explanation-b'],
-            'explanation-c': selected_question['explanation-c'],
-            'explanation-d': selected_question['explanation-d'],
-            'correct answer': selected_question['correct answer'],
-            'question-type': selected_question['question-type'],
-            'question-id': selected_question.get('question-id', 0)
-        }
-
-        print(f"Returning formatted question: {json.dumps(formatted_question, cls=DecimalEncoder)}")
+        with telemetry.phase('serialize'):
+            body = dumps_questions([formatted_question])
+        telemetry.debug("Returning formatted question: %s", body)
 
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps([formatted_question], cls=DecimalEncoder)
+            'body': body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
-        print(f"Error occurred: {str(e)}")
+        telemetry.logger.error("Error occurred: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
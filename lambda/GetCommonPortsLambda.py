@@ -1,17 +1,24 @@
 import json
-import random
-import boto3
-from decimal import Decimal
-from boto3.dynamodb.conditions import Key
+import deadline
+import drill_tables
+import question_snapshot
+from question_json import dumps_questions
+from question_cursor import CURSOR_HEADER
+from response_compression import compressed
+import telemetry
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('ports')
+TABLE_NAME = 'ports'
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+# Validated questions per question-type with 'explanation' precomputed,
+# kept across warm invocations
+partitions = drill_tables.PARTITIONS['ports']
 
+# Map the bundled snapshot during init
+question_snapshot.preload([TABLE_NAME])
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
     # Define allowed origins
     allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
@@ -25,7 +32,8 @@ def lambda_handler(event, context):
         "Access-Control-Allow-Headers": "Content-Type,X-Api-Key,x-api-key,Origin,Authorization",
         "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
         "Access-Control-Allow-Origin": origin if origin in allowed_origins else allowed_origins[0],
-        "Access-Control-Allow-Credentials": "true"
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Expose-Headers": CURSOR_HEADER
     }
     
     # Handle OPTIONS request (preflight)
@@ -38,71 +46,53 @@ def lambda_handler(event, context):
 
     try:
         # Get parameters from either query string or body
-        if "queryStringParameters" in event and event["queryStringParameters"]:
-            params = event["queryStringParameters"]
-        elif "body" in event and event["body"]:
-            params = json.loads(event["body"]) if isinstance(event["body"], str) else event["body"]
-        else:
-            params = {}
+        with telemetry.phase('parse'):
+            if "queryStringParameters" in event and event["queryStringParameters"]:
+                params = event["queryStringParameters"]
+            elif "body" in event and event["body"]:
+                params = json.loads(event["body"]) if isinstance(event["body"], str) else event["body"]
+            else:
+                params = {}
 
-        question_type = params.get("questionType", "identify_protocol_from_number")
+            question_type = params.get("questionType", "identify_protocol_from_number")
 
-        response = table.query(
-            KeyConditionExpression=Key('question-type').eq(question_type)
-        )
+        telemetry.annotate(questionType=question_type)
 
-        items = response.get('Items', [])
-        
-        if not items:
-            return {
-                "statusCode": 404,
-                "headers": headers,
-                "body": json.dumps({"error": "No items found for this question type"})
-            }
-
-        required_fields = [
-            'question-text', 
-            'correct answer',
-            'option-a',
-            'explanation-a',
-            'option-b',
-            'explanation-b',
-            'option-c',
-            'explanation-c',
-            'option-d',
-            'explanation-d'
-        ]
-        
-        valid_items = [
-            item for item in items 
-            if all(key in item for key in required_fields)
-        ]
+        # Next unseen question of the client's cursor, or a random one
+        # when no cursor was sent
+        with telemetry.phase('storage'):
+            selected, next_cursor = partitions.next_unseen(
+                TABLE_NAME,
+                question_type,
+                params.get("cursor")
+            )
 
-        if not valid_items:
+        if not selected:
             return {
                 "statusCode": 404,
                 "headers": headers,
                 "body": json.dumps({
                     "error": "No valid questions found for this type",
-                    "details": "Items exist but are missing required fields"
+                    "details": "No items exist or they are missing required fields"
                 })
             }
 
-        random.shuffle(valid_items)
-        selected = valid_items[:1]
+        headers[CURSOR_HEADER] = next_cursor
 
-        for item in selected:
-            correct_letter = item['correct answer'].lower()
-            item['explanation'] = item[f'explanation-{correct_letter}']
+        with telemetry.phase('serialize'):
+            body = dumps_questions(selected)
 
         return {
             "statusCode": 200,
             "headers": headers,
-            "body": json.dumps(selected, default=decimal_default)
+            "body": body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
-        print(f"Error: {e}")
+        telemetry.logger.error("Error: %s", e)
         return {
             "statusCode": 500,
             "headers": headers,
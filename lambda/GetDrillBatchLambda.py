@@ -0,0 +1,147 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import deadline
+import drill_tables
+import question_snapshot
+from question_json import dumps_questions
+from response_compression import compressed
+import telemetry
+
+# Limits on a single batch request
+MAX_DRILLS = 10
+MAX_QUESTIONS = int(os.environ.get('MAX_DRILL_QUESTIONS', 50))
+MAX_WORKERS = int(os.environ.get('DRILL_WORKERS', 4))
+
+# Map the bundled drill table snapshots during init
+question_snapshot.preload(drill_tables.PARTITIONS)
+
+def parse_drills(body):
+    """
+    Validate [{"table", "questionType", "count", "cursor"}, ...] and merge
+    repeated (table, questionType) pairs so each partition is read once.
+    Returns {(table, questionType): (count, cursor)}.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+    drills = body.get('drills')
+    if not isinstance(drills, list) or not drills:
+        raise ValueError("'drills' must be a non-empty list")
+    if len(drills) > MAX_DRILLS:
+        raise ValueError(f"At most {MAX_DRILLS} drills per request")
+
+    counts = {}
+    for drill in drills:
+        if not isinstance(drill, dict):
+            raise ValueError("Each drill must be an object")
+        table_name = drill.get('table')
+        question_type = drill.get('questionType')
+        cursor = drill.get('cursor')
+        if not isinstance(table_name, str) or table_name not in drill_tables.PARTITIONS:
+            raise ValueError(f"Unknown drill table: {table_name}")
+        if not isinstance(question_type, str) or not question_type:
+            raise ValueError("Each drill needs a questionType")
+        if cursor is not None and not isinstance(cursor, str):
+            raise ValueError("cursor must be a string")
+        count = drill.get('count', 1)
+        # bool is an int subclass, but true is not a count
+        if not isinstance(count, int) or isinstance(count, bool):
+            raise ValueError("count must be an integer")
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        key = (table_name, question_type)
+        previous_count, previous_cursor = counts.get(key, (0, None))
+        counts[key] = (previous_count + count, previous_cursor or cursor)
+
+    if sum(count for count, _ in counts.values()) > MAX_QUESTIONS:
+        raise ValueError(f"At most {MAX_QUESTIONS} questions per request")
+    return counts
+
+def run_drill(table_name, question_type, count, cursor):
+    """
+    Next unseen questions of the drill's cursor (random ones without a
+    cursor) and the cursor to send next time
+    """
+    partitions = drill_tables.PARTITIONS[table_name]
+    return partitions.next_unseen(table_name, question_type, cursor, count)
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
+def lambda_handler(event, context):
+    # Define allowed origins
+    allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
+
+    # Get the origin from the request headers
+    origin = event.get('headers', {}).get('origin', '')
+
+    # Set CORS headers
+    headers = {
+        "Content-Type": "application/json",
+        "Access-Control-Allow-Headers": "Content-Type,X-Api-Key,x-api-key,Origin",
+        "Access-Control-Allow-Methods": "OPTIONS,POST",
+        "Access-Control-Allow-Credentials": "false"
+    }
+
+    # Set Allow-Origin if origin is in allowed list
+    if origin in allowed_origins:
+        headers["Access-Control-Allow-Origin"] = origin
+
+    # Handle OPTIONS request (preflight)
+    if event.get("httpMethod") == "OPTIONS":
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({'message': 'CORS enabled'})
+        }
+
+    try:
+        with telemetry.phase('parse'):
+            body = json.loads(event.get('body') or '{}')
+            counts = parse_drills(body)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    try:
+        # Partitions missing from the warm cache are queried concurrently
+        with telemetry.phase('storage'), ThreadPoolExecutor(max_workers=min(len(counts), MAX_WORKERS)) as pool:
+            drill = deadline.carried(run_drill)
+            futures = {
+                key: pool.submit(drill, key[0], key[1], count, cursor)
+                for key, (count, cursor) in counts.items()
+            }
+            results = [(key, future.result()) for key, future in futures.items()]
+
+        with telemetry.phase('serialize'):
+            drills = [
+                '{"table":%s,"questionType":%s,"cursor":%s,"questions":%s}' % (
+                    json.dumps(table_name),
+                    json.dumps(question_type),
+                    json.dumps(next_cursor),
+                    dumps_questions(questions)
+                )
+                for (table_name, question_type), (questions, next_cursor) in results
+            ]
+            body = '{"drills":[' + ','.join(drills) + ']}'
+        telemetry.annotate(drills=len(counts))
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': body
+        }
+
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
+    except Exception as e:
+        telemetry.logger.error("Error in lambda_handler: %s", e)
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
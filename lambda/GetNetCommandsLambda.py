@@ -1,28 +1,32 @@
 import json
-import boto3
 import os
-import random
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+import deadline
+import drill_tables
+import question_snapshot
+from question_json import dumps_questions
+from question_cursor import CURSOR_HEADER
+from response_compression import compressed
+import telemetry
 
 # Use environment variable or default to 'netCommands'
 TABLE_NAME = os.environ.get('TABLE_NAME', 'netCommands')
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
 
-# JSON encoder to handle Decimal values from DynamoDB
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return int(o) if o % 1 == 0 else float(o)
-        return super().default(o)
+# Questions per question-type, kept across warm invocations
+partitions = drill_tables.PARTITIONS['netCommands']
 
+# Map the bundled snapshot during init
+question_snapshot.preload([TABLE_NAME])
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Headers": "Content-Type",
-        "Access-Control-Allow-Methods": "OPTIONS,GET,POST"
+        "Access-Control-Allow-Methods": "OPTIONS,GET,POST",
+        "Access-Control-Expose-Headers": CURSOR_HEADER
     }
 
     # Handle CORS preflight
@@ -35,9 +39,10 @@ def lambda_handler(event, context):
 
     try:
         # Get query parameters
-        params = event.get('queryStringParameters') or {}
-        question_type = params.get('question-type')
-        count = int(params.get('count', 1))
+        with telemetry.phase('parse'):
+            params = event.get('queryStringParameters') or {}
+            question_type = params.get('question-type')
+            count = int(params.get('count', 1))
 
         if not question_type:
             return {
@@ -46,28 +51,40 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Missing required parameter: question-type'})
             }
 
-        # Query DynamoDB
-        response = table.query(
-            KeyConditionExpression=Key('question-type').eq(question_type)
-        )
-        items = response.get('Items', [])
+        # Next unseen questions of the client's cursor, or random ones
+        # when no cursor was sent
+        telemetry.annotate(questionType=question_type)
+        with telemetry.phase('storage'):
+            selected, next_cursor = partitions.next_unseen(
+                TABLE_NAME,
+                question_type,
+                params.get('cursor'),
+                count
+            )
 
-        if not items:
+        if not selected:
             return {
                 'statusCode': 404,
                 'headers': headers,
                 'body': json.dumps({'error': 'No questions found for this type'})
             }
 
-        selected = random.sample(items, min(count, len(items)))
+        headers[CURSOR_HEADER] = next_cursor
+
+        with telemetry.phase('serialize'):
+            body = dumps_questions(selected)
 
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(selected, cls=DecimalEncoder)
+            'body': body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
+        telemetry.logger.error("Error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
@@ -1,6 +1,10 @@
 import json
 import os
+from response_compression import compressed
+import telemetry
 
+@telemetry.instrumented
+@compressed
 def lambda_handler(event, context):
     # Define allowed origins
     allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
@@ -1,24 +1,63 @@
 import json
 import os
-import urllib3
+import chat_history as history
+import deadline
+from domain_index import DomainIndex
+import exam_tables
+from question_cache import QuestionCache
+from question_cursor import CURSOR_HEADER
+from question_json import dumps_questions
+from question_sampler import QuestionSampler
+import question_snapshot
+from response_compression import compressed
+import telemetry
+import tutor_client
+import tutor_prompt
 
+# Fields every question must have to be served
+REQUIRED_FIELDS = [
+    'question-text',
+    'option-a',
+    'option-b',
+    'option-c',
+    'option-d',
+    'correct answer',
+    'explanation-a',
+    'explanation-b',
+    'explanation-c',
+    'explanation-d'
+]
+MAX_COUNT = 10
+
+# Key arrays of each exam objective, kept across warm invocations
+question_cache = QuestionCache()
+sampler = QuestionSampler(index_cache=question_cache)
+objectives = DomainIndex(sampler)
+
+# Map the exam snapshots bundled with the function during init
+question_snapshot.preload(exam_tables.TABLES)
+
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
-    # Debug logging for incoming request
-    print("Incoming event:", json.dumps(event, indent=2))
+    # Debug logging for incoming request, serialized only when logged
+    telemetry.debug("Incoming event: %s", lambda: json.dumps(event))
     
     # Define allowed origins
     allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
     
     # Get the origin from the request headers
     origin = event.get('headers', {}).get('origin', '')
-    print("Received Origin:", origin)
+    telemetry.debug("Received Origin: %s", origin)
     
     # Set CORS headers
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Headers": "Content-Type,X-Api-Key,x-api-key,Origin",
-        "Access-Control-Allow-Methods": "OPTIONS,POST",
-        "Access-Control-Allow-Credentials": "false"
+        "Access-Control-Allow-Methods": "OPTIONS,GET,POST",
+        "Access-Control-Allow-Credentials": "false",
+        "Access-Control-Expose-Headers": CURSOR_HEADER
     }
     
     # Set Allow-Origin if origin is in allowed list
@@ -35,13 +74,15 @@ def lambda_handler(event, context):
 
     try:
         # API key verification
-        request_api_key = event.get('headers', {}).get('x-api-key')
-        if not request_api_key:
-            request_api_key = event.get('headers', {}).get('X-Api-Key')
-        
-        expected_api_key = os.environ.get('API_GATEWAY_KEY')
+        with telemetry.phase('auth'):
+            request_api_key = event.get('headers', {}).get('x-api-key')
+            if not request_api_key:
+                request_api_key = event.get('headers', {}).get('X-Api-Key')
+            
+            expected_api_key = os.environ.get('API_GATEWAY_KEY')
+            authorized = bool(request_api_key) and request_api_key == expected_api_key
         
-        if not request_api_key or request_api_key != expected_api_key:
+        if not authorized:
             return {
                 'statusCode': 403,
                 'headers': headers,
@@ -50,102 +91,115 @@ def lambda_handler(event, context):
                 })
             }
 
-        # Handle different HTTP methods
-        if event.get("httpMethod") == "GET":
-            # Get parameters from query string
-            params = event.get("queryStringParameters", {})
-            question_context = {
-                'exam': params.get('exam'),
-                'domain': params.get('domain'),
-                'count': params.get('count')
-            }
-        else:  # POST
-            if not event.get('body'):
+        params = event.get("queryStringParameters") or {}
+
+        # Question generation: exam and domain in the query string, sent
+        # as a GET or (as the frontend does) a POST without a body
+        if event.get("httpMethod") == "GET" or (params.get('exam') and not event.get('body')):
+            table_name = exam_tables.table_for(params.get('exam'))
+            domain = params.get('domain')
+            if not table_name or not domain:
                 return {
                     'statusCode': 400,
                     'headers': headers,
-                    'body': json.dumps({'error': 'No body provided'})
+                    'body': json.dumps({'error': f'exam must be one of {", ".join(exam_tables.EXAM_TABLES)} and domain is required'})
                 }
-            
-            body = json.loads(event['body'])
-            question_context = body.get('questionContext', {})
-            chat_history = body.get('chatHistory', [])
-            user_message = body.get('userMessage', '')
-
-        # Process the request based on method
-        if event.get("httpMethod") == "GET":
-            # Handle GET request (question generation)
-            question_data = [{
-                'question-text': 'Your question text here',
-                'option-a': 'Option A',
-                'option-b': 'Option B',
-                'option-c': 'Option C',
-                'option-d': 'Option D',
-                'correct answer': 'A',
-                # Add any other required fields
-            }]
+            try:
+                count = max(1, min(int(params.get('count') or 1), MAX_COUNT))
+            except ValueError:
+                count = 1
+            telemetry.annotate(exam=params.get('exam'), domain=domain)
+
+            # Cached key array of the objective, one keyed read for the pick
+            with telemetry.phase('storage'):
+                questions, next_cursor = objectives.pick(
+                    table_name, domain, params.get('cursor'), count, required_fields=REQUIRED_FIELDS
+                )
+
+            if not questions:
+                return {
+                    'statusCode': 404,
+                    'headers': headers,
+                    'body': json.dumps({'error': f'No questions found for {params.get("exam")} domain {domain}'})
+                }
+
+            if next_cursor:
+                headers[CURSOR_HEADER] = next_cursor
+            with telemetry.phase('serialize'):
+                body = dumps_questions(questions)
 
             return {
                 'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps(question_data)  # Make sure it's an array
+                'body': body
             }
-        else:
-            # Handle POST request (chat functionality)
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"You are a helpful AI tutor. Use the following question context to help the user understand the topic better: "
-                               f"Question: {question_context.get('question_text')}\n"
-                               f"Options:\nA) {question_context.get('option_a')}\n"
-                               f"B) {question_context.get('option_b')}\n"
-                               f"C) {question_context.get('option_c')}\n"
-                               f"D) {question_context.get('option_d')}\n"
-                               f"User selected: {question_context.get('selected_answer')}\n"
-                               f"Correct answer: {question_context.get('correct_answer')}"
-                }
-            ]
-            messages.extend(chat_history)
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
-
-            http = urllib3.PoolManager()
-            openai_response = http.request(
-                'POST',
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}",
-                    "Content-Type": "application/json"
-                },
-                body=json.dumps({
-                    "model": "gpt-3.5-turbo",
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 150
-                })
-            )
 
-            if openai_response.status != 200:
-                return {
-                    'statusCode': openai_response.status,
-                    'headers': headers,
-                    'body': json.dumps({'error': f'OpenAI API error: {openai_response.data.decode("utf-8")}'})
-                }
+        if not event.get('body'):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'No body provided'})
+            }
+
+        if history.body_too_large(event):
+            return {
+                'statusCode': 413,
+                'headers': headers,
+                'body': json.dumps({'error': 'Request body too large'})
+            }
+
+        # A malformed history is refused before it is compacted
+        try:
+            with telemetry.phase('parse'):
+                question_context, chat_history, user_message = history.parse_request(json.loads(event['body']))
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+
+        # Handle POST request (chat functionality)
+        try:
+            messages, tokens, dropped = history.compact(question_context, chat_history, user_message)
+        except history.PromptTooLarge as e:
+            return {
+                'statusCode': 413,
+                'headers': headers,
+                'body': json.dumps({'error': str(e)})
+            }
+        telemetry.count('CompactedTurns', dropped)
+        telemetry.annotate(promptTokens=tokens)
+
+        # Pooled keep-alive connection shared by every invocation of the container
+        with telemetry.phase('upstream'):
+            openai_response = tutor_client.get_client().post(tutor_prompt.completion_request(messages))
+
+        if openai_response.status != 200:
+            return {
+                'statusCode': openai_response.status,
+                'headers': headers,
+                'body': json.dumps({'error': f'OpenAI API error: {openai_response.data.decode("utf-8")}'})
+            }
 
-            response_data = json.loads(openai_response.data.decode('utf-8'))
-            ai_response = response_data['choices'][0]['message']['content']
-            response_data = {'response': ai_response}
+        response_data = json.loads(openai_response.data.decode('utf-8'))
+        ai_response = response_data['choices'][0]['message']['content']
+        response_data = {'response': ai_response}
+
+        with telemetry.phase('serialize'):
+            response_body = json.dumps(response_data)
 
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(response_data)
+            'body': response_body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
-        print(f"Error: {str(e)}")
+        telemetry.logger.error("Error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
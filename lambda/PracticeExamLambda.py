@@ -1,63 +1,73 @@
 import json
 import os
-import boto3
 import random
-from boto3.dynamodb.conditions import Attr
-from decimal import Decimal
+import deadline
+from question_cache import QuestionCache
+from question_sampler import QuestionSampler
+from exam_assembler import ExamAssembler
+import exam_tables
+import question_snapshot
+from question_json import dumps_questions
+from response_compression import compressed
+import telemetry
 
-# Initialize DynamoDB
-dynamodb = boto3.resource('dynamodb')
+# Fields every question must have to be served
+REQUIRED_FIELDS = [
+    'question-text', 
+    'option-a', 
+    'option-b', 
+    'option-c', 
+    'option-d',
+    'correct answer',
+    'explanation-a',
+    'explanation-b',
+    'explanation-c',
+    'explanation-d'
+]
+DEFAULT_COUNT = 30
+# Longest exam is 90 questions
+MAX_COUNT = int(os.environ.get('PRACTICE_EXAM_MAX_COUNT', 100))
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+# Key index of each exam table, kept across warm invocations
+question_cache = QuestionCache()
+sampler = QuestionSampler(index_cache=question_cache)
+assembler = ExamAssembler(sampler)
 
-def get_filtered_questions(exam, count=30):
+# Map the exam snapshots bundled with the function during init
+question_snapshot.preload(exam_tables.TABLES)
+
+def parse_count(value):
     """
-    Fetch questions from the appropriate DynamoDB table based on exam type
+    Question count from the query string, 1 to MAX_COUNT
     """
-    table = dynamodb.Table(exam)  # e.g., 'A1101', 'Net', etc.
-    
     try:
-        # Scan the table for all questions
-        response = table.scan()
-        items = response.get('Items', [])
-        
-        # Validate each question has required fields
-        required_fields = [
-            'question-text', 
-            'option-a', 
-            'option-b', 
-            'option-c', 
-            'option-d',
-            'correct answer',
-            'explanation-a',
-            'explanation-b',
-            'explanation-c',
-            'explanation-d'
-        ]
-        
-        valid_questions = [
-            item for item in items 
-            if all(field in item for field in required_fields)
-        ]
-        
-        if not valid_questions:
-            raise ValueError(f"No valid questions found in table {exam}")
-        
-        # Randomly select the requested number of questions
-        selected_questions = random.sample(
-            valid_questions, 
-            min(count, len(valid_questions))
-        )
-        
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("count must be an integer")
+    if not 1 <= count <= MAX_COUNT:
+        raise ValueError(f"count must be between 1 and {MAX_COUNT}")
+    return count
+
+def get_filtered_questions(table_name, count=DEFAULT_COUNT):
+    """
+    Fetch questions from an exam's question table
+    """
+    try:
+        # Fill the blueprint's domain quotas from the cached per-domain key
+        # pools and read only the chosen items
+        with telemetry.phase('storage'):
+            selected_questions = assembler.assemble(table_name, count, required_fields=REQUIRED_FIELDS)
+        random.shuffle(selected_questions)
+        telemetry.annotate(exam=table_name, questionCache=question_cache.stats())
         return selected_questions
         
-    except Exception as e:
-        print(f"Error fetching questions from DynamoDB: {str(e)}")
+    except Exception:
+        telemetry.logger.exception("Error fetching questions from table %s", table_name)
         raise
 
+@telemetry.instrumented
+@deadline.enforced
+@compressed
 def lambda_handler(event, context):
     # Define allowed origins
     allowed_origins = ['http://localhost:5173', 'https://thecomptiabible.com']
@@ -87,24 +97,46 @@ def lambda_handler(event, context):
 
     try:
         # Get query parameters
-        query_params = event.get('queryStringParameters', {})
-        exam = query_params.get('exam')
-        count = int(query_params.get('count', 30))  # Default to 30 questions
-
-        if not exam:
-            raise ValueError("Exam parameter is required")
+        with telemetry.phase('parse'):
+            query_params = event.get('queryStringParameters') or {}
+            exam = query_params.get('exam')
+            if not exam:
+                raise ValueError("Exam parameter is required")
+            table_name = exam_tables.table_for(exam)
+            if not table_name:
+                raise ValueError(f"exam must be one of {', '.join(exam_tables.EXAM_TABLES)}")
+            count = parse_count(query_params.get('count', DEFAULT_COUNT))
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
 
+    try:
         # Get questions from DynamoDB
-        questions = get_filtered_questions(exam, count)
+        questions = get_filtered_questions(table_name, count)
+        if not questions:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': json.dumps({'error': f"No valid questions found for exam {exam}"})
+            }
+
+        with telemetry.phase('serialize'):
+            body = dumps_questions(questions)
 
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(questions, default=decimal_default)
+            'body': body
         }
 
+    except deadline.DeadlineExceeded as e:
+        return deadline.degraded_response(headers, e)
+
     except Exception as e:
-        print(f"Error in lambda_handler: {str(e)}")
+        telemetry.logger.error("Error in lambda_handler: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
@@ -0,0 +1,78 @@
+import os
+import threading
+import deadline
+from lazy_imports import lazy_module
+
+# boto3 costs a large share of a cold start, so it is only imported once a
+# route reads from AWS
+boto3 = lazy_module('boto3')
+botocore_config = lazy_module('botocore.config')
+
+# Connection settings shared by every AWS client in the container
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 50))
+CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', 1))
+READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', 3))
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', 3))
+
+_clients = {}
+_resources = {}
+_tables = {}
+_lock = threading.RLock()
+
+
+def client_config():
+    return botocore_config.Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        retries={'mode': 'adaptive', 'max_attempts': MAX_ATTEMPTS}
+    )
+
+
+def _check_deadline(**kwargs):
+    # before-send fires ahead of every attempt, retries included, so
+    # botocore stops retrying once the invocation's deadline is close
+    deadline.check()
+
+
+def _with_deadline(client):
+    client.meta.events.register('before-send', _check_deadline)
+    return client
+
+
+def _get_or_build(registry, key, build):
+    value = registry.get(key)
+    if value is None:
+        with _lock:
+            value = registry.get(key)
+            if value is None:
+                value = registry[key] = build()
+    return value
+
+
+def client(service):
+    """
+    Low-level boto3 client, built on first use and reused for the life of
+    the container
+    """
+    return _get_or_build(_clients, service, lambda: _with_deadline(boto3.client(service, config=client_config())))
+
+
+def resource(service):
+    """
+    boto3 service resource, built on first use and reused for the life of
+    the container
+    """
+    def build():
+        service_resource = boto3.resource(service, config=client_config())
+        _with_deadline(service_resource.meta.client)
+        return service_resource
+    return _get_or_build(_resources, service, build)
+
+
+def table(name):
+    """
+    DynamoDB Table resource for name, cached per container
+    """
+    return _get_or_build(_tables, name, lambda: resource('dynamodb').Table(name))
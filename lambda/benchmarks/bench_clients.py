@@ -0,0 +1,59 @@
+"""
+Warm-path cost of getting a DynamoDB table handle, before and after the
+shared client registry.
+
+    python lambda/benchmarks/bench_clients.py --table Commands --runs 50
+
+"per-invocation" rebuilds boto3.resource('dynamodb').Table(...) on every
+call, as GetACommandsLambda used to; "registry" goes through aws_clients.
+With --query-type, each iteration also runs one Query so the effect of the
+reused connection pool and tuned Config shows up in round-trip latency.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import boto3
+from boto3.dynamodb.conditions import Key
+import aws_clients
+
+
+def per_invocation(name):
+    return boto3.resource('dynamodb').Table(name)
+
+
+def registry(name):
+    return aws_clients.table(name)
+
+
+def measure(get_table, args):
+    latencies = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        table = get_table(args.table)
+        if args.query_type:
+            table.query(KeyConditionExpression=Key('question-type').eq(args.query_type), Limit=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--table', default='Commands')
+    parser.add_argument('--query-type', help='question-type to Query; omit to time construction only')
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    registry(args.table)  # the first call is the cold-start cost, paid once
+    for name, get_table in (('per-invocation', per_invocation), ('registry', registry)):
+        latencies = sorted(measure(get_table, args))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{name:<15} p50={statistics.median(latencies):8.2f} ms  p95={p95:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the scan-and-sample path against QuestionSampler on a live table.
+
+    python lambda/benchmarks/bench_sampling.py --table A1101 --count 30 --runs 20
+
+Reports read capacity consumed and latency per request for both paths.
+The sampler's one-off key index load is reported separately, since a warm
+container pays it once rather than on every request.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import boto3
+from question_sampler import QuestionSampler
+from question_store import DynamoQuestionStore
+
+
+def scan_and_sample(table, count):
+    """
+    The original path: read the whole table, then random.sample
+    """
+    items = []
+    rcu = 0.0
+    scan_kwargs = {'ReturnConsumedCapacity': 'TOTAL'}
+    while True:
+        response = table.scan(**scan_kwargs)
+        rcu += response['ConsumedCapacity']['CapacityUnits']
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return random.sample(items, min(count, len(items))), rcu
+
+
+def summarize(name, latencies, rcus):
+    print(
+        f"{name:<16} p50={statistics.median(latencies):8.1f} ms  "
+        f"max={max(latencies):8.1f} ms  rcu/request={statistics.mean(rcus):8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--table', required=True)
+    parser.add_argument('--count', type=int, default=30)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    table = boto3.resource('dynamodb').Table(args.table)
+
+    latencies, rcus = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        _, rcu = scan_and_sample(table, args.count)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rcus.append(rcu)
+    summarize('scan+sample', latencies, rcus)
+
+    store = DynamoQuestionStore()
+    store.return_consumed_capacity = 'TOTAL'
+    sampler = QuestionSampler(store)
+    start = time.perf_counter()
+    index = sampler.key_index(args.table)
+    print(f"{'index load':<16} {(time.perf_counter() - start) * 1000:8.1f} ms  keys={len(index)}")
+
+    latencies, rcus = [], []
+    for _ in range(args.runs):
+        store.consumed_rcu = 0.0
+        start = time.perf_counter()
+        sampler.sample(args.table, args.count)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rcus.append(store.consumed_rcu)
+    summarize('sampler', latencies, rcus)
+
+
+if __name__ == '__main__':
+    main()
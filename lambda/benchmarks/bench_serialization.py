@@ -0,0 +1,64 @@
+"""
+Microbenchmark for building a 90-question practice exam response body.
+
+    python lambda/benchmarks/bench_serialization.py --count 90 --runs 2000
+
+Compares json.dumps with a Decimal default= callback (the old handlers)
+against joining pre-encoded Question fragments from the warm cache.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_json import Question, dumps_questions
+
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def make_item(i):
+    explanation = 'This option is explained in a few sentences of study material. ' * 4
+    return {
+        'question-type': 'exam',
+        'question-id': Decimal(i),
+        'domain': f'{1 + i % 5}.{1 + i % 3}',
+        'difficulty': Decimal('0.5'),
+        'question-text': f'Sample question {i} about ports, protocols and troubleshooting?',
+        'option-a': 'Option A', 'option-b': 'Option B',
+        'option-c': 'Option C', 'option-d': 'Option D',
+        'correct answer': 'A',
+        'explanation-a': explanation, 'explanation-b': explanation,
+        'explanation-c': explanation, 'explanation-d': explanation
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=90)
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+
+    items = [make_item(i) for i in range(args.count)]
+    questions = [Question.from_item(item) for item in items]
+    dumps_questions(questions)  # encode fragments once, as a cache fill would
+
+    assert json.loads(dumps_questions(questions)) == json.loads(json.dumps(items, default=decimal_default))
+
+    baseline = timeit.timeit(lambda: json.dumps(items, default=decimal_default), number=args.runs)
+    fragments = timeit.timeit(lambda: dumps_questions(questions), number=args.runs)
+
+    print(f"json.dumps + default : {baseline / args.runs * 1e6:9.1f} us/response")
+    print(f"joined fragments     : {fragments / args.runs * 1e6:9.1f} us/response")
+    print(f"speedup              : {baseline / fragments:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
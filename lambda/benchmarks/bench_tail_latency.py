@@ -0,0 +1,112 @@
+"""
+Tail latency and success rate of tutor completions against a faulty
+upstream, with and without retries and hedged requests.
+
+    python lambda/benchmarks/bench_tail_latency.py --requests 400 --error-rate 0.1 --slow-rate 0.05
+
+Runs the OpenAI stub with injected errors (429/500/503, Retry-After on
+429 and 503) and slow answers, then sends the same load through a fresh
+TutorClient per policy, each call under a --deadline-ms invocation
+deadline:
+
+    none          no retries, no hedging
+    retry         full-jitter retries (OPENAI_RETRY_ATTEMPTS)
+    retry+hedge   retries, plus a hedged request past the recent p95
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+# urllib3 ships with the contextgpt_lambda bundle
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(BENCH_DIR)), 'contextgpt_lambda'))
+
+import deadline
+import tutor_client
+from openai_stub import OpenAIStub
+
+PAYLOAD = {'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'Why is B correct?'}]}
+POLICIES = {
+    'none': {'RETRY_ATTEMPTS': 0, 'HEDGE': False},
+    'retry': {'RETRY_ATTEMPTS': tutor_client.RETRY_ATTEMPTS or 2, 'HEDGE': False},
+    'retry+hedge': {'RETRY_ATTEMPTS': tutor_client.RETRY_ATTEMPTS or 2, 'HEDGE': True}
+}
+
+
+class Context:
+    def __init__(self, timeout_ms):
+        self.timeout_ms = timeout_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.timeout_ms
+
+
+@deadline.enforced
+def call(client, context):
+    """
+    (latency in ms, status) of one completion under the context's deadline;
+    status 0 when it raised
+    """
+    start = time.perf_counter()
+    try:
+        status = client.post(PAYLOAD).status
+    except Exception:
+        status = 0
+    return (time.perf_counter() - start) * 1000, status
+
+
+def run(stub, policy, args):
+    for name, value in POLICIES[policy].items():
+        setattr(tutor_client, name, value)
+    client = tutor_client.TutorClient(stub.url, api_key='bench', pool_size=args.concurrency)
+
+    # Fill the latency window the hedge delay comes from, without faults
+    error_rate, slow_rate = stub.error_rate, stub.slow_rate
+    stub.error_rate = stub.slow_rate = 0
+    for _ in range(tutor_client.HEDGE_MIN_SAMPLES):
+        call(client, Context(args.deadline_ms))
+    stub.error_rate, stub.slow_rate = error_rate, slow_rate
+
+    sent = stub.requests
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: call(client, Context(args.deadline_ms)), range(args.requests)))
+    upstream = stub.requests - sent
+
+    latencies = sorted(ms for ms, _ in results)
+    ok = sum(1 for _, status in results if status == 200)
+    quantile = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    print(
+        f"{policy:<12} ok={ok / len(results):6.1%}  p50={statistics.median(latencies):8.1f}  "
+        f"p95={quantile(0.95):8.1f}  p99={quantile(0.99):8.1f}  max={latencies[-1]:8.1f} ms  "
+        f"upstream/call={upstream / len(results):4.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=list(POLICIES))
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--slow-rate', type=float, default=0.05)
+    parser.add_argument('--slow-ms', type=float, default=2000)
+    parser.add_argument('--deadline-ms', type=float, default=6000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    stub = OpenAIStub(
+        latency_ms=args.latency_ms, error_rate=args.error_rate, retry_after=args.retry_after,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, seed=args.seed
+    ).start()
+    for policy in args.policies:
+        run(stub, policy, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Profile what each Lambda handler imports during a cold start.
+
+    python lambda/benchmarks/import_profile.py
+    python lambda/benchmarks/import_profile.py --handlers ContextGPT --route options --top 20
+
+Every handler is loaded in a fresh interpreter running `python -X importtime`,
+then invoked once on the chosen route (main, options or unauthorized).
+The report lists, per handler, the cumulative import cost of the modules
+it pulls in. Init imports are those pulled in while the module loads.
+Route imports are those the first invocation pulls in lazily.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import loadtest
+
+# Written to stderr between phases of the child so its importtime lines
+# can be told apart
+INIT_MARKER = '--- loadtest:init ---'
+ROUTE_MARKER = '--- loadtest:route ---'
+END_MARKER = '--- loadtest:end ---'
+
+ROUTES = ['main', 'options', 'unauthorized']
+
+
+def route_event(name, route):
+    _, build_event = loadtest.SCENARIOS[name]
+    event = build_event()
+    if route == 'options':
+        event['httpMethod'] = 'OPTIONS'
+        event['body'] = None
+    elif route == 'unauthorized':
+        event['headers'] = dict(event['headers'], **{'x-api-key': 'wrong'})
+    return event
+
+
+def child(name, route):
+    """
+    Runs inside the profiled interpreter
+    """
+    import importlib.util
+
+    path, _ = loadtest.SCENARIOS[name]
+    event = route_event(name, route)
+
+    print(INIT_MARKER, file=sys.stderr, flush=True)
+    spec = importlib.util.spec_from_file_location('profiled_handler', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # Fill the store only if the handler imported it
+    if 'question_store' in sys.modules:
+        sys.modules['question_store'].set_store(loadtest.build_store(200))
+
+    print(ROUTE_MARKER, file=sys.stderr, flush=True)
+    response = module.lambda_handler(event, loadtest.LambdaContext())
+    print(END_MARKER, file=sys.stderr, flush=True)
+    print(json.dumps({'statusCode': response.get('statusCode')}))
+
+
+def parse_importtime(lines):
+    """
+    'import time: self [us] | cumulative | imported package' lines ->
+    [(module, depth, self_us, cumulative_us)]
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        raw_name = fields[2]
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        entries.append((name, depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def split_phases(stderr):
+    phases = {'init': [], 'route': []}
+    current = None
+    for line in stderr.splitlines():
+        if line == INIT_MARKER:
+            current = 'init'
+        elif line == ROUTE_MARKER:
+            current = 'route'
+        elif line == END_MARKER:
+            current = None
+        elif current:
+            phases[current].append(line)
+    return {phase: parse_importtime(lines) for phase, lines in phases.items()}
+
+
+def profile(name, route, env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', __file__, '--child', name, '--route', route],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{result.stderr[-2000:]}")
+    status = json.loads(result.stdout.strip().splitlines()[-1])['statusCode']
+    return status, split_phases(result.stderr)
+
+
+def top_level_total(entries):
+    # Nested imports are already part of their importer's cumulative time
+    return sum(cumulative for _, depth, _, cumulative in entries if depth == 0)
+
+
+def print_phase(title, entries, top):
+    total = top_level_total(entries)
+    print(f"  {title}: {len(entries)} modules, {total / 1000:.1f} ms")
+    for module, depth, _, cumulative in sorted(entries, key=lambda e: e[3], reverse=True)[:top]:
+        print(f"    {cumulative / 1000:8.2f} ms  {'  ' * depth}{module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--handlers', nargs='+', choices=sorted(loadtest.SCENARIOS), default=list(loadtest.SCENARIOS))
+    parser.add_argument('--route', choices=ROUTES, default='main')
+    parser.add_argument('--top', type=int, default=10, help='modules listed per phase')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.route)
+        return
+
+    stub = loadtest.OpenAIStub().start()
+    env = dict(
+        os.environ,
+        OPENAI_API_URL=stub.url,
+        OPENAI_API_KEY='loadtest',
+        API_GATEWAY_KEY=loadtest.API_KEY,
+        QUESTION_STORE='memory',
+        SNAPSHOT_DIR=os.path.join(BENCH_DIR, 'no-snapshots')
+    )
+    for name in args.handlers:
+        status, phases = profile(name, args.route, env)
+        print(f"{name} ({args.route} route, status {status})")
+        print_phase('init imports', phases['init'], args.top)
+        print_phase('route imports', phases['route'], args.top)
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
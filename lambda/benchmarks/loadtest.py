@@ -0,0 +1,462 @@
+"""
+Invoke every Lambda handler in-process and report latency and memory.
+
+    python lambda/benchmarks/loadtest.py
+    python lambda/benchmarks/loadtest.py --handlers PracticeExam ContextGPT --requests 500 --concurrency 8
+    python lambda/benchmarks/loadtest.py --write-baseline
+    python lambda/benchmarks/loadtest.py --baseline lambda/benchmarks/baseline.json
+
+Handlers read synthetic question banks from a MemoryQuestionStore and talk
+to a local OpenAI stub (openai_stub.py), so nothing leaves the machine.
+
+Cold runs drop every module loaded from lambda/ and contextgpt_lambda/
+and time the import plus the first invocation, like a fresh container.
+Warm runs reuse one loaded module. Latency and throughput come from an
+untraced pass. Allocations are measured in a separate tracemalloc pass,
+because tracing slows every allocation down. Peak RSS is the process
+high-water mark after the scenario, so scenarios later in a run can
+report memory that earlier ones already claimed.
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.dirname(BENCH_DIR)
+REPO_DIR = os.path.dirname(LAMBDA_DIR)
+CONTEXTGPT_DIR = os.path.join(REPO_DIR, 'contextgpt_lambda')
+
+sys.path.insert(0, LAMBDA_DIR)
+# requests and urllib3 are vendored into the ContextGPT bundle
+sys.path.append(CONTEXTGPT_DIR)
+
+import exam_tables
+from openai_stub import OpenAIStub
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+API_KEY = 'loadtest-key'
+EXAM_DOMAINS = {'A1101': 5, 'A1102': 4, 'Net': 5, 'Sec': 5}
+# Relative change in a metric that counts as a regression
+REGRESSION_THRESHOLD = float(os.environ.get('LOADTEST_REGRESSION_THRESHOLD', 0.25))
+# Absolute changes below these are noise, whatever their relative size
+NOISE_FLOORS = {'initMs': 1.0, 'p50Ms': 1.0, 'p95Ms': 1.0, 'p99Ms': 1.0, 'allocKiB': 16.0, 'peakRssKiB': 1024}
+
+
+class LambdaContext:
+    """
+    The parts of the Lambda context object the handlers use
+    """
+    function_name = 'loadtest'
+    memory_limit_in_mb = 512
+    aws_request_id = 'loadtest'
+
+    def __init__(self, timeout_ms=30000):
+        self.deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+def question(key, question_type=None, domain=None):
+    item = {
+        'question-text': f'Synthetic question {key}?',
+        'correct answer': random.choice('ABCD'),
+        'question-id': key
+    }
+    for letter in 'abcd':
+        item[f'option-{letter}'] = f'Option {letter.upper()} of question {key}'
+        item[f'explanation-{letter}'] = f'Why option {letter.upper()} is or is not right for question {key}.'
+    if question_type:
+        item['question-type'] = question_type
+    if domain:
+        item['domain'] = domain
+    return item
+
+
+def build_store(size):
+    """
+    MemoryQuestionStore holding every table the handlers read
+    """
+    from question_store import MemoryQuestionStore
+
+    store = MemoryQuestionStore()
+    for table_name in exam_tables.TABLES:
+        domains = EXAM_DOMAINS[table_name]
+        items = [
+            dict(question(i, domain=f'{i % domains + 1}.{i % 7 + 1}'), id=f'{table_name}-{i}')
+            for i in range(size)
+        ]
+        store.put_table(table_name, ['id'], items)
+
+    partitions = {
+        'Commands': ['command_to_description', 'description_to_command'],
+        'ports': ['identify_protocol_from_number', 'identify_number_from_protocol'],
+        'netCommands': ['windows', 'linux']
+    }
+    for table_name, question_types in partitions.items():
+        items = [
+            question(i, question_type)
+            for question_type in question_types
+            for i in range(size // len(question_types))
+        ]
+        store.put_table(table_name, ['question-type', 'question-id'], items)
+    return store
+
+
+def proxy_event(method, query=None, body=None):
+    """
+    API Gateway REST proxy event as a browser request would produce it
+    """
+    return {
+        'resource': '/',
+        'path': '/',
+        'httpMethod': method,
+        'headers': {
+            'origin': 'http://localhost:5173',
+            'x-api-key': API_KEY,
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Content-Type': 'application/json'
+        },
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'prod', 'requestId': 'loadtest'}
+    }
+
+
+def chat_event(cached=False):
+    # Uncached scenarios skip the tutor answer cache so they measure the
+    # upstream path
+    return proxy_event('POST', body={
+        'bypassCache': not cached,
+        'questionContext': {
+            'question_text': 'Which port does HTTPS use by default?',
+            'option_a': '21',
+            'option_b': '443',
+            'option_c': '80',
+            'option_d': '25',
+            'selected_answer': 'C',
+            'correct_answer': 'B'
+        },
+        'chatHistory': [
+            {'role': 'user', 'content': 'Why is it not 80?'},
+            {'role': 'assistant', 'content': 'Port 80 is plain HTTP.'}
+        ],
+        'userMessage': 'So what is 443 used for?'
+    })
+
+
+def exam_review_event(size=30):
+    """
+    A finished exam with every other answer wrong, reviewed without the
+    answer cache
+    """
+    questions = [
+        {
+            'id': f'A1101-{i}',
+            'question-text': f'Which port does service {i} use by default?',
+            'option-a': '21',
+            'option-b': '443',
+            'option-c': '80',
+            'option-d': '25',
+            'correct answer': 'B'
+        }
+        for i in range(size)
+    ]
+    answers = ['B' if i % 2 else 'C' for i in range(size)]
+    return proxy_event('POST', body={'questions': questions, 'answers': answers, 'bypassCache': True})
+
+
+# name -> (handler file, event builder)
+SCENARIOS = {
+    'PracticeExam': (
+        os.path.join(LAMBDA_DIR, 'PracticeExamLambda.py'),
+        lambda: proxy_event('GET', {'exam': random.choice(list(exam_tables.EXAM_TABLES)), 'count': '30'})
+    ),
+    'GetPracticeExam': (
+        os.path.join(LAMBDA_DIR, 'GetPracticeExamLambda.py'),
+        lambda: proxy_event('GET', {'exam': 'A1101', 'count': '30'})
+    ),
+    'GetACommands': (
+        os.path.join(LAMBDA_DIR, 'GetACommandsLambda.py'),
+        lambda: proxy_event('GET', {'type': 'command_to_description'})
+    ),
+    'GetCommonPorts': (
+        os.path.join(LAMBDA_DIR, 'GetCommonPortsLambda.py'),
+        lambda: proxy_event('POST', body={'questionType': 'identify_protocol_from_number'})
+    ),
+    'GetNetCommands': (
+        os.path.join(LAMBDA_DIR, 'GetNetCommandsLambda.py'),
+        lambda: proxy_event('GET', {'question-type': 'windows', 'count': '5'})
+    ),
+    'GetDrillBatch': (
+        os.path.join(LAMBDA_DIR, 'GetDrillBatchLambda.py'),
+        lambda: proxy_event('POST', body={'drills': [
+            {'table': 'Commands', 'questionType': 'command_to_description', 'count': 5},
+            {'table': 'ports', 'questionType': 'identify_protocol_from_number', 'count': 5},
+            {'table': 'netCommands', 'questionType': 'linux', 'count': 5}
+        ]})
+    ),
+    'GetSingleQuestion': (
+        os.path.join(LAMBDA_DIR, 'GetSingleQuestionLambda.py'),
+        lambda: proxy_event('GET', {'exam': 'A1101', 'domain': '1.1', 'count': '1'})
+    ),
+    'GetSingleQuestionPost': (
+        os.path.join(LAMBDA_DIR, 'GetSingleQuestionLambda.py'),
+        lambda: proxy_event('POST', {'exam': 'Net09', 'domain': '2.3', 'count': '1'})
+    ),
+    'GetSingleQuestionChat': (
+        os.path.join(LAMBDA_DIR, 'GetSingleQuestionLambda.py'),
+        chat_event
+    ),
+    'ContextGPT': (
+        os.path.join(LAMBDA_DIR, 'ContextGPTLambda.py'),
+        chat_event
+    ),
+    'ContextGPTCached': (
+        os.path.join(LAMBDA_DIR, 'ContextGPTLambda.py'),
+        lambda: chat_event(cached=True)
+    ),
+    'ExamReview': (
+        os.path.join(LAMBDA_DIR, 'ExamReviewLambda.py'),
+        exam_review_event
+    ),
+    'ContextGPTBundle': (
+        os.path.join(CONTEXTGPT_DIR, 'lambda_function.py'),
+        chat_event
+    )
+}
+
+
+def purge_modules():
+    """
+    Forget every module loaded from the repository, so the next import
+    runs module-level init again
+    """
+    roots = (LAMBDA_DIR + os.sep, CONTEXTGPT_DIR + os.sep)
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None) or ''
+        if path.startswith(roots) and not path.startswith(BENCH_DIR + os.sep):
+            del sys.modules[name]
+
+
+def load_handler(path, store):
+    """
+    Import a handler file under its own module name (several bundles
+    call theirs lambda_function) with the benchmark store installed
+    """
+    import question_store
+
+    question_store.set_store(store)
+    name = 'loadtest_' + os.path.relpath(path, REPO_DIR).replace(os.sep, '_')[:-3]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def invoke(handler, event):
+    start = time.perf_counter()
+    response = handler(event, LambdaContext())
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.get('statusCode') != 200:
+        raise RuntimeError(f"Handler returned {response.get('statusCode')}: {response.get('body')}")
+    return elapsed
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        'p50Ms': round(statistics.median(ordered), 3),
+        'p95Ms': round(at(0.95), 3),
+        'p99Ms': round(at(0.99), 3)
+    }
+
+
+def peak_rss_kib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def allocations(run, invocations):
+    """
+    Mean bytes allocated at peak per invocation, under tracemalloc
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(invocations):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.mean(peaks) / 1024, 1)
+
+
+def run_cold(path, build_event, store, samples):
+    """
+    Latencies cover init plus the first invocation; initMs is the module
+    import alone, i.e. the Init Duration Lambda reports
+    """
+    latencies, inits = [], []
+
+    def cold_invocation():
+        purge_modules()
+        start = time.perf_counter()
+        handler = load_handler(path, store)
+        init = (time.perf_counter() - start) * 1000
+        invoke(handler, build_event())
+        return init, (time.perf_counter() - start) * 1000
+
+    for _ in range(samples):
+        init, latency = cold_invocation()
+        inits.append(init)
+        latencies.append(latency)
+    return dict(
+        percentiles(latencies),
+        initMs=round(statistics.median(inits), 3),
+        allocKiB=allocations(cold_invocation, min(samples, 3)),
+        peakRssKiB=peak_rss_kib()
+    )
+
+
+def run_warm(path, build_event, store, requests, concurrency):
+    purge_modules()
+    handler = load_handler(path, store)
+    events = [build_event() for _ in range(requests)]
+    # Settle per-container caches before measuring
+    invoke(handler, events[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda event: invoke(handler, event), events))
+    wall = time.perf_counter() - start
+
+    return dict(
+        percentiles(latencies),
+        throughputRps=round(requests / wall, 1),
+        allocKiB=allocations(lambda: invoke(handler, build_event()), min(requests, 20)),
+        peakRssKiB=peak_rss_kib()
+    )
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Print relative changes against the baseline and return the metrics
+    that got worse by more than threshold (and by more than their noise
+    floor)
+    """
+    regressions = []
+    for name, phases in results.items():
+        for phase, metrics in phases.items():
+            previous = baseline.get(name, {}).get(phase)
+            if not previous:
+                continue
+            for metric, value in metrics.items():
+                before = previous.get(metric)
+                if not before:
+                    continue
+                change = (value - before) / before
+                # Higher throughput is better, everything else is a cost
+                worse = -change if metric == 'throughputRps' else change
+                marker = ''
+                if worse > threshold and abs(value - before) > NOISE_FLOORS.get(metric, 0):
+                    marker = '  REGRESSION'
+                    regressions.append(f'{name}.{phase}.{metric}')
+                print(f"  {name:<22} {phase:<5} {metric:<14} {before:>10} -> {value:>10}  {change:+7.1%}{marker}")
+    return regressions
+
+
+def print_report(results):
+    print(
+        f"{'handler':<22} {'phase':<5} {'init ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'req/s':>9} {'alloc KiB':>10} {'RSS KiB':>9}"
+    )
+    for name, phases in results.items():
+        for phase, m in phases.items():
+            throughput = m.get('throughputRps')
+            init = m.get('initMs')
+            print(
+                f"{name:<22} {phase:<5} {f'{init:.2f}' if init is not None else '-':>9} {m['p50Ms']:9.2f} {m['p95Ms']:9.2f} {m['p99Ms']:9.2f} "
+                f"{throughput if throughput is not None else '-':>9} {m['allocKiB']:10.1f} {m['peakRssKiB']:9d}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--handlers', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='warm invocations per handler')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--cold-samples', type=int, default=5)
+    parser.add_argument('--bank-size', type=int, default=1000, help='questions per synthetic table')
+    parser.add_argument('--openai-latency-ms', type=float, default=0)
+    parser.add_argument('--baseline', help='compare against this baseline JSON')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('--write-baseline', nargs='?', const=DEFAULT_BASELINE, help='save results as the baseline')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    stub = OpenAIStub(latency_ms=args.openai_latency_ms).start()
+    snapshot_dir = tempfile.mkdtemp(prefix='loadtest-snapshots-')
+    os.environ.update({
+        'OPENAI_API_URL': stub.url,
+        'OPENAI_API_KEY': 'loadtest',
+        'API_GATEWAY_KEY': API_KEY,
+        'QUESTION_STORE': 'memory',
+        # No snapshots, so the handlers go through the store
+        'SNAPSHOT_DIR': snapshot_dir
+    })
+    store = build_store(args.bank_size)
+
+    results = {}
+    # Handlers print a telemetry line on every request
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name in args.handlers:
+            path, build_event = SCENARIOS[name]
+            results[name] = {
+                'cold': run_cold(path, build_event, store, args.cold_samples),
+                'warm': run_warm(path, build_event, store, args.requests, args.concurrency)
+            }
+    stub.shutdown()
+
+    print_report(results)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nChanges against {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+
+    if args.write_baseline:
+        with open(args.write_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nWrote baseline to {args.write_baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+    python lambda/benchmarks/openai_stub.py --port 8089 --latency-ms 300
+    python lambda/benchmarks/openai_stub.py --error-rate 0.1 --slow-rate 0.05 --slow-ms 3000
+
+Answers POST /v1/chat/completions with a canned completion after a fixed
+delay, so tutor handlers can be exercised without network access or cost.
+
+Faults are injected at random: --error-rate of the requests get one of
+--error-statuses (429 and 503 with a Retry-After of --retry-after
+seconds), and --slow-rate of them take --slow-ms instead of --latency-ms.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    'Option B is correct because it describes the protocol that uses that port. '
+    'The other options belong to different services.'
+)
+
+
+class OpenAIStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle on, a
+    # kept-alive client would wait out its delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        # What the client's connection warmup sends; the connection is kept
+        self.send_response(405)
+        self.send_header('Allow', 'POST')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        fault, latency_ms = self.server.draw()
+        time.sleep(latency_ms / 1000)
+        if fault:
+            self.error(fault)
+            return
+
+        body = json.dumps({
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'model': request.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.server.reply},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def error(self, status):
+        body = json.dumps({'error': {'message': f'Injected fault {status}', 'type': 'stub_fault'}}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status in (429, 503) and self.server.retry_after is not None:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class OpenAIStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0, reply=DEFAULT_REPLY, error_rate=0.0,
+                 error_statuses=(429, 500, 503), retry_after=None, slow_rate=0.0, slow_ms=0, seed=None):
+        super().__init__(('127.0.0.1', port), OpenAIStubHandler)
+        self.latency_ms = latency_ms
+        self.reply = reply
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.requests = 0
+        self.faults = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """
+        (error status or None, latency in ms) for the next request
+        """
+        with self._lock:
+            self.requests += 1
+            fault = None
+            if self._random.random() < self.error_rate:
+                fault = self._random.choice(self.error_statuses)
+                self.faults += 1
+            slow = self._random.random() < self.slow_rate
+        return fault, self.slow_ms if slow else self.latency_ms
+
+    def handle_error(self, request, client_address):
+        # Clients that time out or lose a hedged race hang up mid-answer
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1/chat/completions'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-statuses', type=int, nargs='+', default=[429, 500, 503])
+    parser.add_argument('--retry-after', type=int)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-ms', type=float, default=0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    stub = OpenAIStub(
+        args.port, args.latency_ms, error_rate=args.error_rate,
+        error_statuses=args.error_statuses, retry_after=args.retry_after, slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms, seed=args.seed
+    )
+    print(f"OpenAI stub listening on {stub.url}")
+    stub.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Pack question tables into read-only snapshots for the deployment artifact.
+
+    QUESTION_BANK_VERSION=7 python lambda/build_snapshots.py
+    python lambda/build_snapshots.py --tables ports Commands --version 7
+
+Each table is read in full from the question store (QUESTION_STORE,
+DynamoDB by default) and written to <SNAPSHOT_DIR>/<table>.qsnap. Deploy the functions with the same
+QUESTION_BANK_VERSION so they serve from the snapshot.
+"""
+import argparse
+import os
+import time
+import exam_tables
+import question_snapshot
+from question_cache import current_bank_version
+from question_store import get_store
+
+TABLES = exam_tables.TABLES + ['Commands', 'ports', 'netCommands']
+
+
+def build(table_name, version, output_dir):
+    store = get_store()
+    key_names = store.key_names(table_name)
+
+    start = time.perf_counter()
+    items = store.scan_exam(table_name)
+    path = os.path.join(output_dir, f'{table_name}.qsnap')
+    count = question_snapshot.write_snapshot(path, table_name, key_names, items, version)
+    print(
+        f"{table_name:<12} {count:6d} questions  {os.path.getsize(path) / 1024:8.1f} KiB  "
+        f"{time.perf_counter() - start:6.2f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', nargs='+', default=TABLES)
+    parser.add_argument('--version', default=current_bank_version())
+    parser.add_argument('--output-dir', default=question_snapshot.SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for table_name in args.tables:
+        build(table_name, args.version, args.output_dir)
+
+
+if __name__ == '__main__':
+    main()
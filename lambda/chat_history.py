@@ -0,0 +1,142 @@
+import os
+import re
+import tutor_prompt
+
+# Prompt tokens allowed per completion request: the model's 4096-token
+# window less the answer and some slack for estimation error
+TOKEN_BUDGET = int(os.environ.get('TUTOR_TOKEN_BUDGET', 3000))
+# Part of the budget held back for the digest of older turns
+DIGEST_TOKENS = int(os.environ.get('TUTOR_DIGEST_TOKENS', 300))
+# Request bodies past this are refused before they are parsed
+MAX_BODY_BYTES = int(os.environ.get('TUTOR_MAX_BODY_BYTES', 64 * 1024))
+
+# Chat format overhead per message and for priming the reply, as counted
+# by OpenAI for gpt-3.5-turbo
+MESSAGE_TOKENS = 4
+REPLY_TOKENS = 3
+# Characters of each older turn kept in the digest
+DIGEST_CHARS = 200
+# Roles a client may send in chatHistory; the system turn is the server's
+HISTORY_ROLES = ('user', 'assistant')
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class PromptTooLarge(Exception):
+    """
+    The request cannot fit the token budget even with its history dropped
+    """
+
+    def __init__(self, tokens, budget):
+        super().__init__(f"Prompt needs about {tokens} tokens, the limit is {budget}")
+        self.tokens = tokens
+        self.budget = budget
+
+
+def parse_request(body):
+    """
+    (question_context, chat_history, user_message) of a chat request body,
+    with the defaults the frontend relies on. Raises ValueError for a body
+    of the wrong shape, e.g. a history turn that is not a {role, content}
+    object, so it is refused before the cache key or the prompt is built.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+    question_context = body.get('questionContext') or {}
+    chat_history = body.get('chatHistory') or []
+    user_message = body.get('userMessage') or ''
+    if not isinstance(question_context, dict):
+        raise ValueError("questionContext must be an object")
+    if not isinstance(user_message, str):
+        raise ValueError("userMessage must be a string")
+    if not isinstance(chat_history, list):
+        raise ValueError("chatHistory must be a list")
+    for i, turn in enumerate(chat_history):
+        if not isinstance(turn, dict) or turn.get('role') not in HISTORY_ROLES or not isinstance(turn.get('content'), str):
+            raise ValueError(f"chatHistory[{i}] must be a {{role, content}} object with role user or assistant")
+    # Only what the completions API accepts goes into the prompt
+    chat_history = [{'role': turn['role'], 'content': turn['content']} for turn in chat_history]
+    return question_context, chat_history, user_message
+
+
+def estimate_tokens(text):
+    """
+    Upper-leaning token estimate without a tokenizer: one per word or
+    punctuation mark, plus one per 4 characters past the first 4 of a long
+    word. Close to cl100k_base on English exam text, never far below it.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += 1 + max(0, len(piece) - 4) // 4
+    return tokens
+
+
+def message_tokens(message):
+    return MESSAGE_TOKENS + estimate_tokens(message.get('content'))
+
+
+def prompt_tokens(messages):
+    return REPLY_TOKENS + sum(message_tokens(message) for message in messages)
+
+
+def body_too_large(event, limit=MAX_BODY_BYTES):
+    body = event.get('body') or ''
+    # A str can be up to 4 bytes per character, so only encode near the limit
+    return len(body) * 4 > limit and len(body.encode('utf-8')) > limit
+
+
+def digest(turns, budget=DIGEST_TOKENS):
+    """
+    One system message recapping older turns, each clipped to its start,
+    newest kept when the recap itself runs over budget
+    """
+    lines = []
+    tokens = MESSAGE_TOKENS + estimate_tokens('Earlier in this conversation:')
+    for turn in reversed(turns):
+        content = ' '.join((turn.get('content') or '').split())
+        if len(content) > DIGEST_CHARS:
+            content = content[:DIGEST_CHARS].rsplit(' ', 1)[0] + ' ...'
+        line = f"- {'Student' if turn.get('role') == 'user' else 'Tutor'}: {content}"
+        line_tokens = estimate_tokens(line)
+        if tokens + line_tokens > budget:
+            break
+        lines.append(line)
+        tokens += line_tokens
+    if not lines:
+        return None
+    return {'role': 'system', 'content': '\n'.join(['Earlier in this conversation:'] + lines[::-1])}
+
+
+def compact(question_context, chat_history, user_message, budget=TOKEN_BUDGET):
+    """
+    tutor_prompt.build_messages, fitted to budget: the system prompt and the
+    new message always go in, then as many of the most recent turns as fit,
+    and older turns are collapsed into a digest. Returns (messages,
+    estimated prompt tokens, turns collapsed); raises PromptTooLarge when
+    the system prompt and new message alone are over budget.
+    """
+    messages = tutor_prompt.build_messages(question_context, chat_history, user_message)
+    total = prompt_tokens(messages)
+    if total <= budget:
+        return messages, total, 0
+
+    system, history, latest = messages[0], messages[1:-1], messages[-1]
+    fixed = REPLY_TOKENS + message_tokens(system) + message_tokens(latest)
+    if fixed > budget:
+        raise PromptTooLarge(fixed, budget)
+
+    # Newest turns first, holding back room for the digest
+    reserve = min(DIGEST_TOKENS, budget - fixed)
+    room = budget - fixed - reserve
+    kept = len(history)
+    while kept > 0 and message_tokens(history[kept - 1]) <= room:
+        room -= message_tokens(history[kept - 1])
+        kept -= 1
+    older, recent = history[:kept], history[kept:]
+
+    summary = digest(older, room + reserve) if older else None
+    messages = [system] + ([summary] if summary else []) + recent + [latest]
+    return messages, prompt_tokens(messages), len(older)
+
@@ -0,0 +1,137 @@
+import functools
+import json
+import os
+import time
+from contextvars import ContextVar
+import telemetry
+
+# Kept back from the Lambda timeout to build and return a response once a
+# downstream call gives up
+RESERVE_MS = int(os.environ.get('DEADLINE_RESERVE_MS', 500))
+# Budget outside Lambda, when there is no context to ask
+DEFAULT_BUDGET_MS = int(os.environ.get('DEADLINE_DEFAULT_MS', 30000))
+# A downstream call (or a retry of one) is not started with less time left
+MIN_CALL_MS = int(os.environ.get('DEADLINE_MIN_CALL_MS', 200))
+# Retry-After of the degraded response
+RETRY_AFTER_SECONDS = 2
+
+_current = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """
+    Too little of the invocation's time is left for the next downstream
+    call
+    """
+
+
+class Deadline:
+    """
+    Point in time by which the invocation must have its answer, taken from
+    the Lambda context when the handler starts, less RESERVE_MS
+    """
+    __slots__ = ('expires',)
+
+    def __init__(self, budget_ms):
+        self.expires = time.monotonic() + budget_ms / 1000
+
+    @classmethod
+    def from_context(cls, context, reserve_ms=RESERVE_MS):
+        get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+        remaining_ms = get_remaining() if get_remaining else DEFAULT_BUDGET_MS
+        return cls(remaining_ms - reserve_ms)
+
+    def remaining(self):
+        """
+        Seconds left, never negative
+        """
+        return max(0.0, self.expires - time.monotonic())
+
+    def check(self, needed_ms=MIN_CALL_MS):
+        left = self.remaining() * 1000
+        if left < needed_ms:
+            raise DeadlineExceeded(f"{left:.0f} ms left, {needed_ms} ms needed")
+
+    def bound(self, seconds):
+        """
+        seconds capped to the time left, for a connect or read timeout.
+        Raises DeadlineExceeded when a call is no longer worth starting.
+        """
+        self.check()
+        return min(seconds, self.remaining())
+
+
+def current():
+    """
+    The running invocation's deadline, or None outside a handler (module
+    init, batch scripts)
+    """
+    return _current.get()
+
+
+def check(needed_ms=MIN_CALL_MS):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(needed_ms)
+
+
+def bound(seconds):
+    """
+    Timeout for a downstream call: seconds, capped by the invocation's
+    deadline when there is one
+    """
+    deadline = _current.get()
+    return seconds if deadline is None else deadline.bound(seconds)
+
+
+def expired():
+    deadline = _current.get()
+    return deadline is not None and deadline.remaining() * 1000 < MIN_CALL_MS
+
+
+def carried(fn):
+    """
+    fn running under the caller's deadline, for work handed to a thread
+    pool (worker threads don't inherit context variables)
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(deadline)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def enforced(handler):
+    """
+    Decorator for lambda_handler functions that starts the invocation's
+    deadline from context.get_remaining_time_in_millis()
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        token = _current.set(Deadline.from_context(context))
+        try:
+            return handler(event, context)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+def degraded_response(headers, error):
+    """
+    Quick 503 telling the client to retry, instead of running into the
+    Lambda timeout and an API Gateway 502
+    """
+    telemetry.logger.warning("Deadline reached: %s", error)
+    telemetry.count('DeadlineDegraded')
+    return {
+        'statusCode': 503,
+        'headers': dict(headers, **{'Retry-After': str(RETRY_AFTER_SECONDS)}),
+        'body': json.dumps({'error': 'The service is busy, please try again', 'degraded': True})
+    }
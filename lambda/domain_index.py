@@ -0,0 +1,73 @@
+from key_order import key_order
+import question_cursor
+from question_sampler import QuestionSampler
+import question_snapshot
+
+# Fetches per request before giving up on a domain whose items are all
+# missing required fields
+MAX_FETCHES = 5
+
+
+class DomainIndex:
+    """
+    Primary keys of each (exam table, objective) pair, e.g. ('A1101', '1.3'),
+    kept as an array in the warm container. The array is filled from the
+    table's snapshot when it is current, and otherwise from one Query of
+    the table's domain index. Picking a question is then an O(1) index
+    into the array (or an O(1) cursor step) plus one keyed read, which the
+    sampler's item cache often saves too.
+    """
+
+    def __init__(self, sampler=None):
+        self.sampler = sampler or QuestionSampler()
+
+    def objective(self, table_name, domain):
+        """
+        Cached (keys, order) of the objective: its key tuples in typed key
+        order and the order_tag cursors over them carry. domain is matched
+        as the exact string stored with the items, so '1.10' and '1.1' are
+        different objectives.
+        """
+        names = self.sampler.key_names(table_name)
+        snapshot = question_snapshot.load(table_name)
+
+        def load():
+            if snapshot and snapshot.is_current():
+                keys = [key for key, value in zip(snapshot.keys, snapshot.domains) if value == domain]
+            else:
+                keys = [
+                    tuple(key[name] for name in names)
+                    for key in self.sampler.store.keys_by_domain(table_name, domain)
+                ]
+            keys.sort(key=key_order)
+            return keys, question_cursor.order_tag(keys)
+
+        return self.sampler.index_cache.get((table_name, 'domain', domain), load)
+
+    def keys(self, table_name, domain):
+        """
+        Cached list of key tuples of the objective's questions
+        """
+        return self.objective(table_name, domain)[0]
+
+    def pick(self, table_name, domain, cursor=None, count=1, required_fields=None):
+        """
+        The next count questions of the cursor's permutation of the
+        objective, so a client sending its cursor back sees no repeats
+        until it has covered the objective; a missing cursor starts a random
+        permutation. Items missing a required field are skipped. Returns
+        (questions, next_cursor).
+        """
+        keys, order = self.objective(table_name, domain)
+        names = self.sampler.key_names(table_name)
+        count = min(count, len(keys))
+        selected = []
+
+        for _ in range(MAX_FETCHES):
+            if len(selected) >= count:
+                break
+            positions, cursor = question_cursor.advance(cursor, len(keys), count - len(selected), order)
+            for item in self.sampler.fetch(table_name, [dict(zip(names, keys[i])) for i in positions]):
+                if not required_fields or all(field in item for field in required_fields):
+                    selected.append(item)
+        return selected, cursor
@@ -0,0 +1,59 @@
+from partition_cache import PartitionCache, add_correct_explanation
+from question_json import Question
+
+# Fields a Commands question needs before it can be served
+COMMAND_FIELDS = [
+    'question-text',
+    'option-a',
+    'option-b',
+    'option-c',
+    'option-d',
+    'explanation-a',
+    'explanation-b',
+    'explanation-c',
+    'explanation-d',
+    'correct answer'
+]
+
+# Fields a ports question needs before it can be served
+PORT_FIELDS = [
+    'question-text', 
+    'correct answer',
+    'option-a',
+    'explanation-a',
+    'option-b',
+    'explanation-b',
+    'option-c',
+    'explanation-c',
+    'option-d',
+    'explanation-d'
+]
+
+
+def format_command_question(item):
+    """
+    Response shape of a command question, built once when the partition loads
+    """
+    return Question({
+        'question-text': item['question-text'],
+        'option-a': item['option-a'],
+        'option-b': item['option-b'],
+        'option-c': item['option-c'],
+        'option-d': item['option-d'],
+        'explanation-a': item['explanation-a'],
+        'explanation-b': item['explanation-b'],
+        'explanation-c': item['explanation-c'],
+        'explanation-d': item['explanation-d'],
+        'correct answer': item['correct answer'],
+        'question-type': item['question-type'],
+        'question-id': item.get('question-id', 0)
+    })
+
+
+# Question-type partition caches of the drill tables, kept across warm
+# invocations. Each entry matches what its single-question handler serves.
+PARTITIONS = {
+    'Commands': PartitionCache(required_fields=COMMAND_FIELDS, prepare=format_command_question),
+    'ports': PartitionCache(required_fields=PORT_FIELDS, prepare=add_correct_explanation),
+    'netCommands': PartitionCache()
+}
@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import deadline
+
+# Number of parallel scan segments used for a full table read
+DEFAULT_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', 4))
+
+
+def projection_args(attributes):
+    """
+    Build ProjectionExpression kwargs for attribute names that contain
+    spaces or dashes ('correct answer', 'question-text', ...), which have
+    to go through ExpressionAttributeNames.
+    """
+    if not attributes:
+        return {}
+    names = {f'#p{i}': name for i, name in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def scan_segment(table, segment, total_segments, **kwargs):
+    """
+    Read one segment of the table, following LastEvaluatedKey to the end
+    """
+    items = []
+    scan_kwargs = dict(kwargs)
+    if total_segments > 1:
+        scan_kwargs['Segment'] = segment
+        scan_kwargs['TotalSegments'] = total_segments
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def parallel_scan(table, attributes=None, total_segments=DEFAULT_SEGMENTS, **kwargs):
+    """
+    Read every item of a table, splitting it into Segment/TotalSegments
+    slices that are scanned concurrently on a thread pool.
+    """
+    kwargs.update(projection_args(attributes))
+    total_segments = max(1, total_segments)
+
+    if total_segments == 1:
+        return scan_segment(table, 0, 1, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        futures = [
+            pool.submit(deadline.carried(scan_segment), table, segment, total_segments, **kwargs)
+            for segment in range(total_segments)
+        ]
+        items = []
+        for future in futures:
+            items.extend(future.result())
+    return items
+
+
+def query_all(table, **kwargs):
+    """
+    Run a Query and follow LastEvaluatedKey until every page is read.
+    Items come back in sort key order.
+    """
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items
+        kwargs['ExclusiveStartKey'] = last_key
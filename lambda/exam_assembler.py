@@ -0,0 +1,132 @@
+from question_sampler import draw_indices
+import question_snapshot
+
+# CompTIA exam objectives: percentage of the exam per domain, keyed by
+# question table (exam_tables.table_for maps the frontend's exam codes).
+# Domain numbers match the src/data/<exam>/<d>_<n>.json notes.
+BLUEPRINTS = {
+    'A1101': {'1': 13, '2': 23, '3': 25, '4': 11, '5': 28},
+    'A1102': {'1': 31, '2': 25, '3': 22, '4': 22},
+    'Net': {'1': 23, '2': 20, '3': 19, '4': 14, '5': 24},
+    'Sec': {'1': 12, '2': 22, '3': 18, '4': 28, '5': 20}
+}
+
+# Item attribute holding the objective, e.g. '2.3'
+DOMAIN_ATTRIBUTE = 'domain'
+
+
+def major_domain(value):
+    """
+    '2.3' -> '2'. Returns None for items without a domain.
+    """
+    if value is None:
+        return None
+    return str(value).split('.')[0].strip() or None
+
+
+def domain_quotas(weights, count, available):
+    """
+    Split count questions across domains in proportion to weights using
+    largest remainders. Domains that run out of questions hand their share
+    to the others, so the total only falls short when the bank does.
+    """
+    quotas = {domain: 0 for domain in weights}
+    active = {domain: weight for domain, weight in weights.items() if available.get(domain, 0) > 0}
+    remaining = count
+
+    while remaining > 0 and active:
+        total = sum(active.values())
+        shares = {domain: remaining * weight / total for domain, weight in active.items()}
+        allocation = {domain: int(share) for domain, share in shares.items()}
+        leftover = remaining - sum(allocation.values())
+        by_remainder = sorted(active, key=lambda d: shares[d] - allocation[d], reverse=True)
+        for domain in by_remainder[:leftover]:
+            allocation[domain] += 1
+
+        for domain, wanted in allocation.items():
+            take = min(wanted, available[domain] - quotas[domain])
+            quotas[domain] += take
+            remaining -= take
+            if quotas[domain] >= available[domain]:
+                active.pop(domain)
+
+    return quotas
+
+
+class ExamAssembler:
+    """
+    Builds exams whose domain mix follows the CompTIA blueprint.
+
+    Per-domain pools of primary keys are read once with a keys-only scan and
+    kept in the sampler's index cache, so assembling an exam only reads the
+    k chosen items.
+    """
+
+    def __init__(self, sampler):
+        self.sampler = sampler
+
+    def domain_pools(self, table_name):
+        """
+        Cached {major domain: [key tuple, ...]} for the table
+        """
+        names = self.sampler.key_names(table_name)
+        snapshot = question_snapshot.load(table_name)
+
+        def load():
+            pools = {}
+            if snapshot and snapshot.is_current():
+                for key, domain in zip(snapshot.keys, snapshot.domains):
+                    pools.setdefault(major_domain(domain), []).append(key)
+                return pools
+            for item in self.sampler.store.scan_exam(table_name, attributes=names + [DOMAIN_ATTRIBUTE]):
+                domain = major_domain(item.get(DOMAIN_ATTRIBUTE))
+                pools.setdefault(domain, []).append(tuple(item[name] for name in names))
+            return pools
+
+        return self.sampler.index_cache.get((table_name, DOMAIN_ATTRIBUTE), load)
+
+    def assemble(self, table_name, count, required_fields=None):
+        """
+        Return up to count questions with blueprint-weighted domain quotas.
+        Items missing a required field are skipped and their domain's
+        shortfall goes to the domains with questions left, so the exam only
+        falls short when the table has fewer valid questions. Falls back to uniform sampling for exams without a blueprint or
+        tables whose items carry no domain.
+        """
+        weights = BLUEPRINTS.get(table_name)
+        if not weights:
+            return self.sampler.sample(table_name, count, required_fields=required_fields)
+
+        pools = self.domain_pools(table_name)
+        available = {domain: len(pools.get(domain, [])) for domain in weights}
+        if not any(available.values()):
+            return self.sampler.sample(table_name, count, required_fields=required_fields)
+
+        names = self.sampler.key_names(table_name)
+        used = {domain: set() for domain in weights}
+        filled = {domain: 0 for domain in weights}
+        selected = []
+
+        while True:
+            # A domain can still supply what it has served plus its undrawn
+            # keys. Drawn items that fail required_fields lower that, and
+            # recomputing the quotas hands the shortfall to the others.
+            capacity = {domain: filled[domain] + available[domain] - len(used[domain]) for domain in weights}
+            quotas = domain_quotas(weights, count, capacity)
+
+            # One batch read covers the outstanding quota of every domain
+            keys = []
+            for domain, quota in quotas.items():
+                pool = pools.get(domain, [])
+                for i in draw_indices(len(pool), quota - filled[domain], used[domain]):
+                    keys.append(dict(zip(names, pool[i])))
+            if not keys:
+                return selected
+
+            for item in self.sampler.fetch(table_name, keys):
+                if required_fields and not all(field in item for field in required_fields):
+                    continue
+                domain = major_domain(item.get(DOMAIN_ATTRIBUTE))
+                if domain in filled:
+                    filled[domain] += 1
+                    selected.append(item)
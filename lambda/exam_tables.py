@@ -0,0 +1,21 @@
+# Question table behind each exam code the frontend sends
+EXAM_TABLES = {
+    'A1101': 'A1101',
+    'A1102': 'A1102',
+    'Net09': 'Net',
+    'Sec701': 'Sec'
+}
+
+# Every exam question table, in EXAM_TABLES order
+TABLES = list(dict.fromkeys(EXAM_TABLES.values()))
+
+
+def table_for(exam):
+    """
+    Question table of an exam code, or None for an unknown exam. Table
+    names are accepted as their own code, so 'Net09' and 'Net' both read
+    the Net table.
+    """
+    if exam in EXAM_TABLES:
+        return EXAM_TABLES[exam]
+    return exam if exam in TABLES else None
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+# DynamoDB orders Number keys by value and String keys by their UTF-8
+# bytes, which is the code point order Python compares str in. Sorting
+# str(value) instead puts question-id 10 before 2.
+NUMBER_TYPES = (int, float, Decimal)
+
+
+def value_order(value):
+    """
+    Sort key of one key attribute value, numbers before strings
+    """
+    if isinstance(value, NUMBER_TYPES) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+
+def key_order(key):
+    """
+    Sort key of a primary key tuple
+    """
+    return tuple(value_order(value) for value in key)
+
+
+def item_order(key_names):
+    """
+    sorted() key function ordering items (or key dicts) by primary key
+    """
+    return lambda item: key_order(item[name] for name in key_names)
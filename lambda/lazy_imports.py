@@ -0,0 +1,46 @@
+import sys
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+        requests = lazy_module('requests')
+        ...
+        requests.post(url, json=payload)  # requests is imported here
+
+    Routes that never touch the module (CORS preflights, auth failures,
+    validation errors, cache hits) never pay for importing it during a
+    cold start.
+    """
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # __import__ (unlike importlib.import_module) goes through the
+            # C import path, so -X importtime reports the module itself.
+            # The import system serializes concurrent first imports.
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded() else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+    def is_loaded(self):
+        return self._module is not None or self._name in sys.modules
+
+
+def lazy_module(name):
+    """
+    The module itself when it is already imported, a LazyModule otherwise
+    """
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,73 @@
+from key_order import item_order
+import question_cursor
+from question_cache import QuestionCache, DEFAULT_TTL
+from question_json import Question
+from question_store import get_store
+import question_snapshot
+
+
+def add_correct_explanation(question):
+    """
+    Copy the explanation of the correct option into 'explanation'
+    """
+    correct_letter = question['correct answer'].lower()
+    question['explanation'] = question[f'explanation-{correct_letter}']
+    return question
+
+
+class PartitionCache:
+    """
+    Validated items of each question-type partition, kept in the warm
+    container, read from the table's snapshot when it is current and from
+    the question store otherwise. Items are normalized and passed through
+    prepare() once when the partition is loaded, so picking a question is an
+    O(1) index into a list (or an O(1) cursor step) and its JSON fragment is
+    reused across requests.
+    """
+
+    def __init__(self, required_fields=None, prepare=None, ttl=DEFAULT_TTL):
+        self.required_fields = required_fields or []
+        self.prepare = prepare
+        self.cache = QuestionCache(ttl=ttl)
+
+    def partition(self, table_name, question_type):
+        """
+        (questions, order) of one partition: its validated questions in
+        typed sort key order and the order_tag cursors over them carry
+        """
+        snapshot = question_snapshot.load(table_name)
+
+        def load():
+            if snapshot and snapshot.is_current():
+                names = snapshot.key_names
+                items = [snapshot.question(i) for i in snapshot.partition(question_type)]
+            else:
+                store = get_store()
+                names = store.key_names(table_name)
+                items = store.query_by_type(table_name, question_type)
+            questions, keys = [], []
+            for item in sorted(items, key=item_order(names)):
+                if not all(field in item for field in self.required_fields):
+                    continue
+                keys.append(tuple(item[name] for name in names))
+                question = item if isinstance(item, Question) else Question.from_item(item)
+                if self.prepare:
+                    question = self.prepare(question)
+                questions.append(question)
+            return questions, question_cursor.order_tag(keys)
+
+        return self.cache.get((table_name, question_type), load)
+
+    def items(self, table_name, question_type):
+        return self.partition(table_name, question_type)[0]
+
+    def next_unseen(self, table_name, question_type, cursor, count=1):
+        """
+        The next count questions of the cursor's permutation of the
+        partition, so a client that sends its cursor back sees no repeats
+        until it has covered the partition. Returns (questions, next_cursor).
+        """
+        questions, order = self.partition(table_name, question_type)
+        positions, next_cursor = question_cursor.advance(cursor, len(questions), count, order)
+        return [questions[i] for i in positions], next_cursor
+
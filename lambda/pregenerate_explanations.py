@@ -0,0 +1,138 @@
+"""
+Pregenerate first-turn tutor explanations into the shared answer cache.
+
+    TUTOR_CACHE_STORE=dynamodb python lambda/pregenerate_explanations.py
+    python lambda/pregenerate_explanations.py --tables A1101 Net --concurrency 8
+
+Every question of each exam table is paired with every answer the user can
+select. The first-turn prompt for the pair is built with tutor_prompt,
+exactly as ContextGPT builds it, and completed once against OPENAI_API_URL.
+The answer is written without an expiry to the tutor_cache shared tier
+(TUTOR_CACHE_STORE). ContextGPT reads that tier before calling OpenAI, so
+these first turns are cache hits.
+
+Each finished cache key is appended to --checkpoint as soon as its answer
+is stored. A rerun skips those keys, so an interrupted run carries on
+where it stopped. The keys cover the prompt fields, model and
+TUTOR_CACHE_VERSION, so changing any of them regenerates everything.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import exam_tables
+from question_store import get_store
+import telemetry
+import tutor_cache
+import tutor_client
+import tutor_prompt
+
+TABLES = exam_tables.TABLES
+# Answers the frontend sends as selected_answer
+SELECTIONS = ['A', 'B', 'C', 'D']
+# Matched after tutor_cache.normalize_message
+MESSAGES = list(tutor_prompt.OPENING_MESSAGES)
+
+
+def jobs(store, tables, messages, done):
+    """
+    (cache key, messages) for every first turn not in done
+    """
+    for table_name in tables:
+        for question in store.scan_exam(table_name):
+            for letter in SELECTIONS:
+                if not question.get(f'option-{letter.lower()}'):
+                    continue
+                context = tutor_prompt.question_context(question, letter)
+                for message in messages:
+                    key = tutor_cache.cache_key(context, message, [])
+                    if key not in done:
+                        yield key, tutor_prompt.build_messages(context, [], message)
+
+
+def generate(client, shared, key, messages):
+    response = client.post(tutor_prompt.completion_request(messages))
+    if response.status != 200:
+        raise tutor_client.UpstreamError(response.status, response.data.decode('utf-8', 'replace'))
+    answer = json.loads(response.data)['choices'][0]['message']['content']
+    shared.put(key, answer, ttl=None)
+    return key
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def pregenerate(store, shared, client, tables=TABLES, messages=MESSAGES, checkpoint='pregenerate.checkpoint',
+                concurrency=4):
+    """
+    Generate and store every missing first turn, at most concurrency
+    completions in flight. Failed turns are logged and left out of the
+    checkpoint for the next run. Returns (generated, failed).
+    """
+    done = load_checkpoint(checkpoint)
+    pending = jobs(store, tables, messages, done)
+    generated = failed = 0
+    reported = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, open(checkpoint, 'a') as log:
+        in_flight = set()
+        while True:
+            # Keep the queue bounded instead of submitting the whole bank
+            for key, prompt in pending:
+                in_flight.add(executor.submit(generate, client, shared, key, prompt))
+                if len(in_flight) >= concurrency * 2:
+                    break
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    key = future.result()
+                except Exception as e:
+                    failed += 1
+                    telemetry.logger.warning("Pregeneration failed: %s", e)
+                    continue
+                log.write(key + '\n')
+                log.flush()
+                generated += 1
+
+            if generated + failed - reported >= 100:
+                reported = generated + failed
+                print(f"{generated:6d} generated  {failed:4d} failed  {time.perf_counter() - start:8.1f} s")
+
+    print(
+        f"{generated:6d} generated  {failed:4d} failed  {len(done):6d} skipped  "
+        f"{time.perf_counter() - start:8.1f} s"
+    )
+    return generated, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', nargs='+', default=TABLES)
+    parser.add_argument('--messages', nargs='+', default=MESSAGES)
+    parser.add_argument('--checkpoint', default='pregenerate.checkpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    shared = tutor_cache.shared_tier()
+    if shared is None:
+        parser.error('set TUTOR_CACHE_STORE to the shared tier ContextGPT reads, e.g. dynamodb')
+
+    client = tutor_client.TutorClient(pool_size=args.concurrency)
+    generated, failed = pregenerate(
+        get_store(), shared, client, args.tables, args.messages, args.checkpoint, args.concurrency
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Default lifetime of a cached question bank in a warm container (seconds)
+DEFAULT_TTL = int(os.environ.get('QUESTION_CACHE_TTL', 900))
+# Upper bound on individually cached questions per container
+DEFAULT_MAX_ITEMS = int(os.environ.get('QUESTION_CACHE_MAX_ITEMS', 20000))
+
+
+def current_bank_version():
+    """
+    Version of the question banks the container should be serving.
+    Bump QUESTION_BANK_VERSION on the function after reloading a table
+    to invalidate every warm cache without waiting for the TTL.
+    """
+    return os.environ.get('QUESTION_BANK_VERSION', '0')
+
+
+class QuestionCache:
+    """
+    In-process cache of validated question lists, keyed by exam table.
+    Lives at module level so it survives across warm invocations.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, version_fn=current_bank_version):
+        self.ttl = ttl
+        self.version_fn = version_fn
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """
+        Return the cached value for key, calling loader() to fill it when
+        the entry is missing, expired or was built for an older version.
+        """
+        version = self.version_fn()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['version'] == version and entry['expires'] > now:
+                self.hits += 1
+                return entry['value']
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = {
+                'value': value,
+                'version': version,
+                'expires': time.monotonic() + self.ttl
+            }
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'hitRate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class ItemCache:
+    """
+    Bounded LRU of individual questions keyed by (table, primary key), with
+    the same TTL and version rules as QuestionCache.
+    """
+
+    def __init__(self, max_items=DEFAULT_MAX_ITEMS, ttl=DEFAULT_TTL, version_fn=current_bank_version):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.version_fn = version_fn
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """
+        Return {key: item} for every key that has a live entry
+        """
+        version = self.version_fn()
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and entry[1] == version and entry[2] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Store an iterable of (key, item) pairs
+        """
+        version = self.version_fn()
+        expires = time.monotonic() + self.ttl
+
+        with self._lock:
+            for key, item in items:
+                self._entries[key] = (item, version, expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'hitRate': round(self.hits / total, 4) if total else 0.0
+        }
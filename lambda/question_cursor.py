@@ -0,0 +1,109 @@
+import hashlib
+import secrets
+
+# Feistel rounds; four give a well-mixed permutation for small domains
+ROUNDS = 4
+# Response header carrying the cursor for the next request
+CURSOR_HEADER = 'X-Question-Cursor'
+
+
+class FeistelPermutation:
+    """
+    Pseudo-random permutation of range(size) keyed by seed. Any position is
+    mapped in O(1) time and memory: a balanced Feistel network permutes the
+    smallest even-bit domain covering size, and cycle walking skips values
+    outside range(size) (fewer than four steps on average).
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seed = seed
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self.half_bits = bits // 2
+        self.mask = (1 << self.half_bits) - 1
+
+    def _round(self, round_number, value):
+        digest = hashlib.blake2b(
+            f'{self.seed}:{round_number}:{value}'.encode(),
+            digest_size=8
+        ).digest()
+        return int.from_bytes(digest, 'big') & self.mask
+
+    def _encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.mask
+        for round_number in range(ROUNDS):
+            left, right = right, left ^ self._round(round_number, right)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        value = self._encrypt(position)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+
+def order_tag(keys):
+    """
+    Short fingerprint of the order of a list of primary key tuples. A
+    cursor carries the tag of the order it was issued for, so a reload
+    that reorders, adds or drops questions restarts it instead of
+    continuing a permutation over different positions.
+    """
+    digest = hashlib.blake2b(repr(list(keys)).encode(), digest_size=4).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def encode_cursor(seed, offset, size, order=0):
+    return f'{seed:x}-{offset:x}-{size:x}-{order:x}'
+
+
+def decode_cursor(cursor):
+    """
+    (seed, offset, size, order) from a cursor string, or None if it is
+    malformed
+    """
+    try:
+        seed, offset, size, order = (int(part, 16) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return seed, offset, size, order
+
+
+def advance(cursor, size, count=1, order=0):
+    """
+    Hand out the next count unseen positions in range(size).
+
+    The cursor travels with the client, so the server keeps no session
+    state. A missing or malformed cursor, or one issued for a bank of a
+    different size or order (see order_tag), starts a fresh permutation;
+    once every position has been served a new permutation starts with a
+    new seed.
+    Returns (positions, next_cursor).
+    """
+    if size <= 0:
+        return [], None
+
+    state = decode_cursor(cursor) if cursor else None
+    if state is None or state[2] != size or state[3] != order or state[1] >= size:
+        seed, offset = secrets.randbits(32), 0
+    else:
+        seed, offset, _, _ = state
+
+    permutation = FeistelPermutation(size, seed)
+    positions = []
+    seen = set()
+    while len(positions) < min(count, size):
+        if offset >= size:
+            seed, offset = secrets.randbits(32), 0
+            permutation = FeistelPermutation(size, seed)
+        position = permutation[offset]
+        offset += 1
+        # A batch that runs into the next cycle must not repeat itself
+        if position not in seen:
+            seen.add(position)
+            positions.append(position)
+
+    return positions, encode_cursor(seed, offset, size, order)
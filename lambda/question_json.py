@@ -0,0 +1,92 @@
+import json
+from decimal import Decimal
+
+
+def normalize(value):
+    """
+    Convert DynamoDB Decimals (and sets) into plain JSON types once, so
+    encoding never has to fall back to a default= callback.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [normalize(item) for item in value]
+    return value
+
+
+class Question(dict):
+    """
+    A normalized question whose JSON encoding is computed once and reused
+    by every response that includes it.
+    """
+    __slots__ = ('_fragment',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment = None
+
+    @classmethod
+    def from_item(cls, item):
+        return cls(normalize(item))
+
+    @classmethod
+    def from_fragment(cls, fragment):
+        """
+        Decode an already-normalized question, keeping its encoding
+        """
+        question = cls(json.loads(fragment))
+        question._fragment = fragment
+        return question
+
+    @property
+    def fragment(self):
+        if self._fragment is None:
+            self._fragment = json.dumps(self, separators=(',', ':'))
+        return self._fragment
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] != value:
+            self._fragment = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._fragment = None
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._fragment = None
+        super().update(*args, **kwargs)
+
+    def __ior__(self, other):
+        self._fragment = None
+        return super().__ior__(other)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._fragment = None
+        return super().setdefault(key, default)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._fragment = None
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self._fragment = None
+        return super().popitem()
+
+    def clear(self):
+        self._fragment = None
+        super().clear()
+
+
+def dumps_questions(questions):
+    """
+    JSON array of questions built by joining their pre-encoded fragments
+    """
+    return '[' + ','.join(
+        question.fragment if isinstance(question, Question) else json.dumps(normalize(question))
+        for question in questions
+    ) + ']'
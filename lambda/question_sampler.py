@@ -0,0 +1,129 @@
+import random
+from question_cache import QuestionCache, ItemCache
+from question_json import Question
+from question_store import get_store
+import question_snapshot
+
+
+def draw_indices(size, count, used):
+    """
+    Pick count distinct positions in range(size) that are not in used, and
+    add them to used. Rejection sampling keeps this O(count) while most of
+    the range is still free.
+    """
+    count = min(count, size - len(used))
+    if count <= 0:
+        return []
+    if (len(used) + count) * 2 > size:
+        free = [i for i in range(size) if i not in used]
+        picked = random.sample(free, count)
+    else:
+        picked = []
+        while len(picked) < count:
+            i = random.randrange(size)
+            if i not in used:
+                used.add(i)
+                picked.append(i)
+    used.update(picked)
+    return picked
+
+
+class QuestionSampler:
+    """
+    Draws k random questions from a table in O(k) reads.
+
+    Phase one picks k primary keys from a compact index (one tuple per item)
+    that is read once with a keys-only projection and kept in the warm
+    container. Phase two fetches just those items from the question store.
+    Fetched items are normalized into Question objects once and kept in an
+    LRU, so questions that come up again cost no reads and are not
+    re-encoded.
+    """
+
+    def __init__(self, store=None, index_cache=None, item_cache=None):
+        self._store = store
+        self.index_cache = index_cache or QuestionCache()
+        self.item_cache = item_cache or ItemCache()
+
+    @property
+    def store(self):
+        return self._store or get_store()
+
+    def key_names(self, table_name):
+        """
+        Primary key attribute names of the table, hash key first
+        """
+        snapshot = question_snapshot.load(table_name)
+        if snapshot:
+            return snapshot.key_names
+        return self.store.key_names(table_name)
+
+    def key_index(self, table_name, question_type=None):
+        """
+        Cached list of key tuples for the whole table, or for one
+        question-type partition
+        """
+        names = self.key_names(table_name)
+        snapshot = question_snapshot.load(table_name)
+
+        def load():
+            if snapshot and snapshot.is_current():
+                positions = range(snapshot.count) if question_type is None else snapshot.partition(question_type)
+                return [snapshot.keys[i] for i in positions]
+            if question_type is None:
+                items = self.store.scan_exam(table_name, attributes=names)
+            else:
+                items = self.store.query_by_type(table_name, question_type, attributes=names)
+            return [tuple(item[name] for name in names) for item in items]
+
+        return self.index_cache.get((table_name, question_type), load)
+
+    def sample(self, table_name, count, question_type=None, required_fields=None):
+        """
+        Return up to count random items. Items missing any required field
+        are dropped and replaced from the rest of the index.
+        """
+        index = self.key_index(table_name, question_type)
+        names = self.key_names(table_name)
+
+        selected = []
+        used = set()
+        while len(selected) < count and len(used) < len(index):
+            batch = draw_indices(len(index), count - len(selected), used)
+            keys = [dict(zip(names, index[i])) for i in batch]
+            for item in self.fetch(table_name, keys):
+                if not required_fields or all(field in item for field in required_fields):
+                    selected.append(item)
+        return selected
+
+    def fetch(self, table_name, keys):
+        """
+        Fetch items by primary key, serving what it can from the item cache
+        and then the table's snapshot while it is current. Keys in neither
+        (items added after the snapshot was built, or every key once
+        QUESTION_BANK_VERSION moves past it) are read from the question
+        store.
+        """
+        names = self.key_names(table_name)
+        cache_keys = [(table_name, tuple(key[name] for name in names)) for key in keys]
+        cached = self.item_cache.get_many(cache_keys)
+        missing = [key for key, cache_key in zip(keys, cache_keys) if cache_key not in cached]
+
+        snapshot = question_snapshot.load(table_name)
+        if snapshot and snapshot.is_current() and missing:
+            unresolved = []
+            for key in missing:
+                position = snapshot.position(tuple(key[name] for name in names))
+                if position is None:
+                    unresolved.append(key)
+                else:
+                    question = snapshot.question(position)
+                    cached[(table_name, tuple(question[name] for name in names))] = question
+            missing = unresolved
+
+        fetched = [Question.from_item(item) for item in self.store.get_by_ids(table_name, missing)] if missing else []
+
+        self.item_cache.put_many(list(cached.items()) + [
+            ((table_name, tuple(item[name] for name in names)), item) for item in fetched
+        ])
+        return list(cached.values()) + fetched
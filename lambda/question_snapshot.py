@@ -0,0 +1,154 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from key_order import item_order
+from question_cache import current_bank_version
+from question_json import Question, normalize
+
+# File layout (little endian):
+#   header   magic, format version, record count, metadata length
+#   metadata JSON: table, bank version, key names, key tuples, domain strings
+#   offsets  count + 1 u64 offsets into the record area
+#   records  compact JSON of each normalized item, sorted by primary key
+MAGIC = b'QSNP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHxxII')
+OFFSET = struct.Struct('<Q')
+
+SNAPSHOT_DIR = os.environ.get(
+    'SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+)
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def snapshot_path(table_name):
+    return os.path.join(SNAPSHOT_DIR, f'{table_name}.qsnap')
+
+
+def domain_text(value):
+    """
+    Objective as the client sends it. Taken before normalizing, since a
+    Number domain 1.10 would become the float 1.1.
+    """
+    return None if value is None else str(value)
+
+
+def write_snapshot(path, table_name, key_names, items, version, domain_attribute='domain'):
+    """
+    Pack items into a snapshot file. Items are normalized and sorted by
+    typed primary key, as the store returns them, so each question-type
+    partition is a contiguous range in sort key order.
+    """
+    items = sorted(items, key=item_order(key_names))
+    questions = [normalize(item) for item in items]
+    records = [json.dumps(question, separators=(',', ':')).encode('utf-8') for question in questions]
+    metadata = json.dumps({
+        'table': table_name,
+        'version': version,
+        'keyNames': key_names,
+        'keys': [[question[name] for name in key_names] for question in questions],
+        'domains': [domain_text(item.get(domain_attribute)) for item in items]
+    }, separators=(',', ':')).encode('utf-8')
+
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(metadata)))
+        f.write(metadata)
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        for record in records:
+            f.write(record)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class QuestionSnapshot:
+    """
+    Read-only, memory-mapped question bank for one table. Only the small
+    metadata block is parsed at load; a question is decoded on demand from
+    its slice of the record area, and its bytes double as the question's
+    pre-encoded JSON fragment.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, count, metadata_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} question snapshot")
+
+        metadata_start = HEADER.size
+        metadata = json.loads(self._map[metadata_start:metadata_start + metadata_length])
+        self.table_name = metadata['table']
+        self.version = metadata['version']
+        self.key_names = metadata['keyNames']
+        self.keys = [tuple(key) for key in metadata['keys']]
+        self.domains = metadata['domains']
+        self.count = count
+
+        self._offsets_start = metadata_start + metadata_length
+        self._records_start = self._offsets_start + OFFSET.size * (count + 1)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        self._partitions = {}
+        for i, key in enumerate(self.keys):
+            start, _ = self._partitions.get(key[0], (i, i))
+            self._partitions[key[0]] = (start, i + 1)
+
+    def is_current(self):
+        """
+        True when the snapshot was built for the bank version the
+        container is configured to serve
+        """
+        return self.version == current_bank_version()
+
+    def question(self, position):
+        """
+        Decode one question without touching the rest of the file
+        """
+        start, = OFFSET.unpack_from(self._map, self._offsets_start + OFFSET.size * position)
+        end, = OFFSET.unpack_from(self._map, self._offsets_start + OFFSET.size * (position + 1))
+        raw = self._map[self._records_start + start:self._records_start + end]
+        return Question.from_fragment(raw.decode('utf-8'))
+
+    def position(self, key):
+        """
+        Record position of a primary key tuple, or None if it is not in the
+        snapshot
+        """
+        return self._positions.get(key)
+
+    def partition(self, value):
+        """
+        range of record positions whose hash key equals value
+        """
+        start, end = self._partitions.get(value, (0, 0))
+        return range(start, end)
+
+
+def load(table_name):
+    """
+    Memory-map the table's snapshot once per container. Returns None when
+    the deployment artifact has no snapshot for the table.
+    """
+    with _lock:
+        if table_name not in _snapshots:
+            path = snapshot_path(table_name)
+            _snapshots[table_name] = QuestionSnapshot(path) if os.path.exists(path) else None
+        return _snapshots[table_name]
+
+
+def preload(table_names):
+    """
+    Map every available snapshot during the init phase
+    """
+    for table_name in table_names:
+        load(table_name)
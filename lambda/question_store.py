@@ -0,0 +1,408 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import aws_clients
+import deadline
+from dynamo_scan import parallel_scan, query_all, projection_args
+from key_order import item_order
+from lazy_imports import lazy_module
+import telemetry
+
+# Only the configured backend's dependencies are ever imported
+botocore_exceptions = lazy_module('botocore.exceptions')
+conditions = lazy_module('boto3.dynamodb.conditions')
+dynamodb_types = lazy_module('boto3.dynamodb.types')
+sqlite3 = lazy_module('sqlite3')
+
+# Partition key shared by the Commands, ports and netCommands tables
+PARTITION_KEY = 'question-type'
+# Exam objective attribute of the exam tables, e.g. '2.3', and the
+# KEYS_ONLY global secondary index with it as partition key
+DOMAIN_KEY = 'domain'
+DOMAIN_INDEX = os.environ.get('QUESTION_DOMAIN_INDEX', 'domain-index')
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_LIMIT = 100
+BATCH_GET_WORKERS = int(os.environ.get('BATCH_GET_WORKERS', 4))
+# Attempts at draining UnprocessedKeys before giving up on a batch
+MAX_UNPROCESSED_RETRIES = 5
+
+
+def is_missing_index(error):
+    """
+    True for the ValidationException DynamoDB answers a Query of an index
+    the table does not have with
+    """
+    details = error.response.get('Error', {})
+    return details.get('Code') == 'ValidationException' and 'specified index' in details.get('Message', '')
+
+
+def project(item, attributes):
+    if not attributes:
+        return item
+    return {name: item[name] for name in attributes if name in item}
+
+
+class QuestionStore:
+    """
+    Storage interface the handlers read question banks through. Tables are
+    addressed by name; keys are dicts of primary key attribute values.
+    """
+
+    def key_names(self, table_name):
+        """
+        Primary key attribute names, hash key first
+        """
+        raise NotImplementedError
+
+    def query_by_type(self, table_name, question_type, attributes=None):
+        """
+        Every item of one question-type partition, in sort key order
+        """
+        raise NotImplementedError
+
+    def scan_exam(self, table_name, attributes=None):
+        """
+        Every item of the table
+        """
+        raise NotImplementedError
+
+    def keys_by_domain(self, table_name, domain):
+        """
+        Primary keys (as dicts) of the exam table's items for one objective
+        """
+        raise NotImplementedError
+
+    def get_by_ids(self, table_name, keys):
+        """
+        Items for the given keys, in no particular order; unknown keys are
+        skipped
+        """
+        raise NotImplementedError
+
+    def sample(self, table_name, count, question_type=None):
+        """
+        Up to count random items of the table or of one partition
+        """
+        names = self.key_names(table_name)
+        if question_type is None:
+            candidates = self.scan_exam(table_name, attributes=names)
+        else:
+            candidates = self.query_by_type(table_name, question_type, attributes=names)
+        keys = random.sample(candidates, min(count, len(candidates)))
+        return self.get_by_ids(table_name, keys)
+
+
+class DynamoQuestionStore(QuestionStore):
+    """
+    DynamoDB tables through the shared client registry
+    """
+
+    def __init__(self):
+        self.return_consumed_capacity = None
+        self.consumed_rcu = 0.0
+        self._key_names = {}
+        self._capacity_lock = threading.Lock()
+
+    def key_names(self, table_name):
+        if table_name not in self._key_names:
+            schema = aws_clients.table(table_name).key_schema
+            schema = sorted(schema, key=lambda k: k['KeyType'] != 'HASH')
+            self._key_names[table_name] = [k['AttributeName'] for k in schema]
+        return self._key_names[table_name]
+
+    def query_by_type(self, table_name, question_type, attributes=None):
+        query_kwargs = dict(projection_args(attributes), KeyConditionExpression=conditions.Key(PARTITION_KEY).eq(question_type))
+        return query_all(aws_clients.table(table_name), **self._with_capacity(query_kwargs))
+
+    def scan_exam(self, table_name, attributes=None):
+        return parallel_scan(aws_clients.table(table_name), attributes=attributes)
+
+    def keys_by_domain(self, table_name, domain):
+        """
+        One Query of the table's DOMAIN_INDEX, in key order. A table
+        without the index is scanned for the domain instead, with a warning,
+        rather than failing the request.
+        """
+        names = self.key_names(table_name)
+        table = aws_clients.table(table_name)
+        query_kwargs = dict(
+            projection_args(names),
+            IndexName=DOMAIN_INDEX,
+            KeyConditionExpression=conditions.Key(DOMAIN_KEY).eq(domain)
+        )
+        try:
+            keys = query_all(table, **self._with_capacity(query_kwargs))
+        except botocore_exceptions.ClientError as e:
+            if not is_missing_index(e):
+                raise
+            telemetry.logger.warning(
+                "Table %s has no %s index, scanning for domain %s", table_name, DOMAIN_INDEX, domain
+            )
+            keys = [
+                project(item, names) for item in parallel_scan(table, attributes=names + [DOMAIN_KEY])
+                if str(item.get(DOMAIN_KEY)) == domain
+            ]
+        return sorted(keys, key=item_order(names))
+
+    def get_by_ids(self, table_name, keys):
+        """
+        Keys are split into BatchGetItem calls of at most 100 keys, which
+        run in parallel when there is more than one
+        """
+        chunks = [keys[i:i + BATCH_GET_LIMIT] for i in range(0, len(keys), BATCH_GET_LIMIT)]
+        if len(chunks) <= 1:
+            return self._get_chunk(table_name, chunks[0]) if chunks else []
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), BATCH_GET_WORKERS)) as pool:
+            results = list(pool.map(deadline.carried(lambda chunk: self._get_chunk(table_name, chunk)), chunks))
+        return [item for items in results for item in items]
+
+    def _get_chunk(self, table_name, keys):
+        """
+        One BatchGetItem call, retrying UnprocessedKeys with jittered
+        exponential backoff
+        """
+        serializer = dynamodb_types.TypeSerializer()
+        deserializer = dynamodb_types.TypeDeserializer()
+        client = aws_clients.table(table_name).meta.client
+        request = {
+            table_name: {
+                'Keys': [
+                    {name: serializer.serialize(value) for name, value in key.items()}
+                    for key in keys
+                ]
+            }
+        }
+        items = []
+        attempt = 0
+        while request:
+            response = client.batch_get_item(**self._with_capacity({'RequestItems': request}))
+            self._record_capacity(response)
+            for raw in response.get('Responses', {}).get(table_name, []):
+                items.append({name: deserializer.deserialize(value) for name, value in raw.items()})
+
+            request = response.get('UnprocessedKeys') or None
+            if request:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    remaining = len(request[table_name]['Keys'])
+                    raise RuntimeError(f"BatchGetItem left {remaining} keys unprocessed in table {table_name}")
+                pause = random.uniform(0, min(1.0, 0.025 * 2 ** attempt))
+                # Only wait for a retry the deadline leaves room for
+                deadline.check(pause * 1000 + deadline.MIN_CALL_MS)
+                time.sleep(pause)
+        return items
+
+    def _with_capacity(self, kwargs):
+        if self.return_consumed_capacity:
+            return dict(kwargs, ReturnConsumedCapacity=self.return_consumed_capacity)
+        return kwargs
+
+    def _record_capacity(self, response):
+        capacity = response.get('ConsumedCapacity')
+        if isinstance(capacity, dict):
+            capacity = [capacity]
+        with self._capacity_lock:
+            for entry in capacity or []:
+                self.consumed_rcu += float(entry.get('CapacityUnits', 0))
+
+
+class MemoryQuestionStore(QuestionStore):
+    """
+    Question banks held in process, for local runs and benchmarks
+    """
+
+    def __init__(self):
+        self._tables = {}
+
+    def put_table(self, table_name, key_names, items):
+        items = sorted(items, key=item_order(key_names))
+        self._tables[table_name] = {
+            'keyNames': list(key_names),
+            'items': items,
+            'byKey': {tuple(item[name] for name in key_names): item for item in items}
+        }
+
+    def _table(self, table_name):
+        try:
+            return self._tables[table_name]
+        except KeyError:
+            raise ValueError(f"Unknown table {table_name}")
+
+    def key_names(self, table_name):
+        return self._table(table_name)['keyNames']
+
+    def query_by_type(self, table_name, question_type, attributes=None):
+        return [
+            project(item, attributes) for item in self._table(table_name)['items']
+            if item.get(PARTITION_KEY) == question_type
+        ]
+
+    def scan_exam(self, table_name, attributes=None):
+        return [project(item, attributes) for item in self._table(table_name)['items']]
+
+    def keys_by_domain(self, table_name, domain):
+        table = self._table(table_name)
+        return [
+            project(item, table['keyNames']) for item in table['items']
+            if str(item.get(DOMAIN_KEY)) == domain
+        ]
+
+    def get_by_ids(self, table_name, keys):
+        table = self._table(table_name)
+        found = (table['byKey'].get(tuple(key[name] for name in table['keyNames'])) for key in keys)
+        return [item for item in found if item is not None]
+
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    if isinstance(value, set):
+        return list(value)
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+class SQLiteQuestionStore(QuestionStore):
+    """
+    Question banks in an indexed SQLite file. Items are stored as JSON with
+    the partition key and primary key pulled out into indexed columns.
+    The encoded key column compares as text, so results are put in typed
+    key order in Python.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS bank_tables (
+            table_name TEXT PRIMARY KEY,
+            key_names TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS questions (
+            table_name TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            question_type TEXT,
+            item TEXT NOT NULL,
+            PRIMARY KEY (table_name, item_key)
+        );
+        CREATE INDEX IF NOT EXISTS questions_by_type ON questions (table_name, question_type);
+        CREATE INDEX IF NOT EXISTS questions_by_domain ON questions (table_name, json_extract(item, '$.domain'));
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._key_names = {}
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path)
+        return connection
+
+    @staticmethod
+    def _encode_key(values):
+        return json.dumps(list(values), default=json_default)
+
+    def put_table(self, table_name, key_names, items):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO bank_tables VALUES (?, ?)',
+                (table_name, json.dumps(list(key_names)))
+            )
+            connection.execute('DELETE FROM questions WHERE table_name = ?', (table_name,))
+            connection.executemany('INSERT INTO questions VALUES (?, ?, ?, ?)', [
+                (
+                    table_name,
+                    self._encode_key(item[name] for name in key_names),
+                    item.get(PARTITION_KEY),
+                    json.dumps(item, default=json_default)
+                )
+                for item in items
+            ])
+        self._key_names.pop(table_name, None)
+
+    def key_names(self, table_name):
+        if table_name not in self._key_names:
+            row = self._connection().execute(
+                'SELECT key_names FROM bank_tables WHERE table_name = ?', (table_name,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown table {table_name}")
+            self._key_names[table_name] = json.loads(row[0])
+        return self._key_names[table_name]
+
+    def query_by_type(self, table_name, question_type, attributes=None):
+        rows = self._connection().execute(
+            'SELECT item FROM questions WHERE table_name = ? AND question_type = ?',
+            (table_name, question_type)
+        )
+        items = sorted((json.loads(row[0]) for row in rows), key=item_order(self.key_names(table_name)))
+        return [project(item, attributes) for item in items]
+
+    def scan_exam(self, table_name, attributes=None):
+        rows = self._connection().execute(
+            'SELECT item FROM questions WHERE table_name = ?', (table_name,)
+        )
+        items = sorted((json.loads(row[0]) for row in rows), key=item_order(self.key_names(table_name)))
+        return [project(item, attributes) for item in items]
+
+    def keys_by_domain(self, table_name, domain):
+        names = self.key_names(table_name)
+        rows = self._connection().execute(
+            "SELECT item_key FROM questions WHERE table_name = ? AND json_extract(item, '$.domain') = ?",
+            (table_name, domain)
+        )
+        return sorted((dict(zip(names, json.loads(row[0]))) for row in rows), key=item_order(names))
+
+    def get_by_ids(self, table_name, keys):
+        names = self.key_names(table_name)
+        encoded = [self._encode_key(key[name] for name in names) for key in keys]
+        items = []
+        # Stay well under SQLite's bound parameter limit
+        for start in range(0, len(encoded), 500):
+            chunk = encoded[start:start + 500]
+            rows = self._connection().execute(
+                f'SELECT item FROM questions WHERE table_name = ? AND item_key IN ({",".join("?" * len(chunk))})',
+                [table_name] + chunk
+            )
+            items.extend(json.loads(row[0]) for row in rows)
+        return items
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    The container's question store, chosen by QUESTION_STORE:
+    'dynamodb' (default), 'sqlite' (file at QUESTION_STORE_PATH) or 'memory'
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.environ.get('QUESTION_STORE', 'dynamodb')
+            if backend == 'dynamodb':
+                _store = DynamoQuestionStore()
+            elif backend == 'sqlite':
+                _store = SQLiteQuestionStore(os.environ.get('QUESTION_STORE_PATH', 'questions.db'))
+            elif backend == 'memory':
+                _store = MemoryQuestionStore()
+            else:
+                raise ValueError(f"Unknown QUESTION_STORE backend: {backend}")
+        return _store
+
+
+def set_store(store):
+    """
+    Replace the container's question store, e.g. with a pre-filled
+    MemoryQuestionStore in a local benchmark
+    """
+    global _store
+    with _store_lock:
+        _store = store
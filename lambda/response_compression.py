@@ -0,0 +1,129 @@
+import base64
+import functools
+import importlib.util
+import os
+from lazy_imports import lazy_module
+import telemetry
+
+# Compressors are imported by the first response large enough to need one.
+# brotli is optional; its presence is checked without importing it.
+gzip = lazy_module('gzip')
+brotli = lazy_module('brotli') if importlib.util.find_spec('brotli') else None
+
+# Bodies smaller than this go out uncompressed
+MIN_COMPRESS_BYTES = int(os.environ.get('MIN_COMPRESS_BYTES', 1024))
+
+
+def parse_accept_encoding(header):
+    """
+    'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}
+    """
+    encodings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    """
+    Pick the best encoding the client accepts: brotli when the module is
+    available, then gzip. Returns None for identity.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli else ['gzip']
+    best = None
+    best_quality = 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def request_header(event, name):
+    headers = event.get('headers') or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def decode_request(event):
+    """
+    The event with its body as text. The REST API registers */* as a
+    binary media type so compressed responses reach the browser (whose
+    fetch sends Accept: */*), which also makes API Gateway base64 encode
+    every request body. A body that doesn't decode is left as it came, for
+    the handler to reject.
+    """
+    if not event.get('isBase64Encoded') or event.get('body') is None:
+        return event
+    try:
+        body = base64.b64decode(event['body'], validate=True).decode('utf-8')
+    except ValueError:
+        return event
+    return dict(event, body=body, isBase64Encoded=False)
+
+
+def compress_response(event, response):
+    """
+    Compress an API Gateway proxy response when the client accepts it and
+    the body is large enough. Bodies go out base64 with isBase64Encoded,
+    which API Gateway decodes for the */* binary media type.
+    """
+    body = response.get('body')
+    headers = response.setdefault('headers', {})
+    if not isinstance(body, str) or response.get('isBase64Encoded') or 'Content-Encoding' in headers:
+        return response
+
+    data = body.encode('utf-8')
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+
+    # From here the encoding depends on Accept-Encoding, so caches must key
+    # on it even when the body goes out uncompressed
+    vary = headers.get('Vary')
+    if not vary:
+        headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        headers['Vary'] = f'{vary}, Accept-Encoding'
+
+    encoding = choose_encoding(request_header(event, 'Accept-Encoding'))
+    if not encoding:
+        return response
+
+    with telemetry.phase('serialize'):
+        response['body'] = base64.b64encode(compress(encoding, data)).decode('ascii')
+    response['isBase64Encoded'] = True
+    headers['Content-Encoding'] = encoding
+    return response
+
+
+def compressed(handler):
+    """
+    Decorator for lambda_handler functions that decodes base64 request
+    bodies and negotiates response compression
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        event = decode_request(event)
+        return compress_response(event, handler(event, context))
+    return wrapper
@@ -0,0 +1,151 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import random
+import resource
+import time
+from contextvars import ContextVar
+
+# Standard library logging level of the handlers' log lines
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# Share of invocations that log debug lines whatever LOG_LEVEL says
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0))
+# CloudWatch namespace of the embedded metrics
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'TheComptiaBible')
+
+UNITS = {'ColdStart': 'Count', 'MaxMemoryMB': 'Megabytes'}
+
+logger = logging.getLogger('handlers')
+logger.setLevel(LOG_LEVEL)
+
+_current = ContextVar('invocation', default=None)
+_cold = True
+
+
+class Invocation:
+    """
+    Phase timings and properties of one handler invocation, emitted as a
+    single CloudWatch Embedded Metric Format line when it ends
+    """
+    __slots__ = ('function', 'cold', 'sampled', 'timings', 'counts', 'properties', 'start')
+
+    def __init__(self, function, cold):
+        self.function = function
+        self.cold = cold
+        self.sampled = LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE
+        self.timings = {}
+        self.counts = {}
+        self.properties = {}
+        self.start = time.perf_counter()
+
+    def record(self, status, request_id=None):
+        metrics = {f'{name}Ms': round(ms, 3) for name, ms in self.timings.items()}
+        metrics.update(self.counts)
+        metrics['DurationMs'] = round((time.perf_counter() - self.start) * 1000, 3)
+        metrics['ColdStart'] = int(self.cold)
+        metrics['MaxMemoryMB'] = round(peak_memory_mb(), 1)
+
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Function']],
+                    'Metrics': [
+                        {'Name': name, 'Unit': 'Count' if name in self.counts else UNITS.get(name, 'Milliseconds')}
+                        for name in metrics
+                    ]
+                }]
+            },
+            'Function': self.function,
+            'statusCode': status,
+            'requestId': request_id
+        }
+        record.update(self.properties)
+        record.update(metrics)
+        return record
+
+
+def peak_memory_mb():
+    # ru_maxrss is KiB on Linux, which is what Lambda runs
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def phase(name):
+    """
+    Add the time spent in the block to the current invocation's phase,
+    e.g. parse, auth, storage, upstream or serialize. A no-op outside an
+    instrumented handler.
+    """
+    invocation = _current.get()
+    if invocation is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        invocation.timings[name] = invocation.timings.get(name, 0.0) + elapsed
+
+
+def count(name, value=1):
+    """
+    Record a Count metric, e.g. a 0/1 cache hit whose average is the hit
+    rate
+    """
+    invocation = _current.get()
+    if invocation is not None:
+        invocation.counts[name] = invocation.counts.get(name, 0) + value
+
+
+def annotate(**properties):
+    """
+    Attach searchable properties (not metrics) to the invocation's line
+    """
+    invocation = _current.get()
+    if invocation is not None:
+        invocation.properties.update(properties)
+
+
+def debug(message, *args):
+    """
+    Log a debug line when LOG_LEVEL is DEBUG or the invocation was
+    sampled. Callable args are evaluated only when the line is logged, so
+    expensive payloads cost nothing otherwise:
+
+        telemetry.debug('Incoming event: %s', lambda: json.dumps(event))
+    """
+    invocation = _current.get()
+    if not (logger.isEnabledFor(logging.DEBUG) or (invocation is not None and invocation.sampled)):
+        return
+    args = tuple(arg() if callable(arg) else arg for arg in args)
+    # handle() skips the level check, so sampled lines get through at INFO
+    logger.handle(logger.makeRecord(logger.name, logging.DEBUG, __file__, 0, message, args, None))
+
+
+def instrumented(handler):
+    """
+    Decorator for lambda_handler functions that times the invocation and
+    prints its EMF line, tagged cold for the container's first invocation
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _cold
+        cold, _cold = _cold, False
+        function = getattr(context, 'function_name', None) or handler.__module__
+        invocation = Invocation(function, cold)
+        token = _current.set(invocation)
+        status = 500
+        try:
+            response = handler(event, context)
+            status = response.get('statusCode')
+            return response
+        finally:
+            _current.reset(token)
+            record = invocation.record(status, getattr(context, 'aws_request_id', None))
+            print(json.dumps(record, separators=(',', ':')))
+    return wrapper
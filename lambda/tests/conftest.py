@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Handlers import their helpers as top-level modules, as in the Lambda
+# deployment package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Handlers read from an in-memory store and never from bundled snapshots
+os.environ.setdefault('QUESTION_STORE', 'memory')
+os.environ.setdefault('SNAPSHOT_DIR', tempfile.mkdtemp(prefix='snapshots-'))
+# No OpenAI connection during handler init
+os.environ.setdefault('TUTOR_PREWARM', 'false')
+
+import question_store
+
+
+def exam_question(i, domain):
+    return {
+        'id': f'q{i}',
+        'domain': domain,
+        'question-text': f'Question {i}?',
+        'option-a': 'A', 'option-b': 'B', 'option-c': 'C', 'option-d': 'D',
+        'correct answer': 'A',
+        'explanation-a': 'a', 'explanation-b': 'b', 'explanation-c': 'c', 'explanation-d': 'd'
+    }
+
+
+def drill_question(i, question_type):
+    question = exam_question(i, None)
+    del question['id'], question['domain']
+    return dict(question, **{'question-type': question_type, 'question-id': i})
+
+
+@pytest.fixture
+def store():
+    """
+    MemoryQuestionStore with 20 questions over five domains in each exam
+    table and 10 per drill partition, installed as the process-wide store
+    """
+    memory = question_store.MemoryQuestionStore()
+    for table_name in ['A1101', 'A1102', 'Net', 'Sec']:
+        memory.put_table(table_name, ['id'], [
+            exam_question(i, f'{i % 5 + 1}.{i % 3 + 1}') for i in range(20)
+        ])
+    partitions = {
+        'Commands': ['command_to_description', 'description_to_command'],
+        'ports': ['identify_protocol_from_number', 'identify_number_from_protocol'],
+        'netCommands': ['windows', 'linux']
+    }
+    for table_name, question_types in partitions.items():
+        memory.put_table(table_name, ['question-type', 'question-id'], [
+            drill_question(i, question_type) for question_type in question_types for i in range(10)
+        ])
+    question_store.set_store(memory)
+    yield memory
+    question_store.set_store(None)
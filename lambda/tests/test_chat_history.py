@@ -0,0 +1,122 @@
+import json
+import pytest
+import chat_history as history
+import ContextGPTLambda
+import GetSingleQuestionLambda
+
+CONTEXT = {'question_text': 'Which port does HTTPS use by default?', 'option_a': '21', 'option_b': '443'}
+
+
+def turns(count, words=50):
+    return [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': f'turn {i} ' + ' '.join(['word'] * words)}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ('', 0),
+    (None, 0),
+    ('hello world', 2),
+    ('port 443?', 3),
+    ('abcdefgh', 2),
+])
+def test_estimate_tokens(text, tokens):
+    assert history.estimate_tokens(text) == tokens
+
+
+def test_short_conversation_is_untouched():
+    messages, tokens, dropped = history.compact(CONTEXT, turns(4), 'Why 443?', budget=3000)
+    assert dropped == 0
+    assert messages[1:-1] == turns(4)
+    assert tokens == history.prompt_tokens(messages) <= 3000
+
+
+@pytest.mark.parametrize('budget', [400, 800, 1500])
+def test_long_conversation_is_fitted_to_the_budget(budget):
+    chat = turns(60)
+    messages, tokens, dropped = history.compact(CONTEXT, chat, 'Why 443?', budget=budget)
+    assert tokens == history.prompt_tokens(messages) <= budget
+    assert dropped > 0
+    # System prompt first, newest turns verbatim, new message last
+    assert messages[0]['role'] == 'system'
+    assert messages[-1] == {'role': 'user', 'content': 'Why 443?'}
+    recent = messages[-1 - (len(chat) - dropped):-1]
+    assert recent == chat[dropped:]
+    # Older turns are recapped in a digest after the system prompt
+    assert messages[1]['role'] == 'system'
+    assert messages[1]['content'].startswith('Earlier in this conversation:')
+
+
+def test_digest_keeps_the_newest_turns_within_budget():
+    summary = history.digest(turns(40), budget=100)
+    assert history.message_tokens(summary) <= 100
+    assert 'turn 39' in summary['content']
+    assert 'turn 0 ' not in summary['content']
+
+
+def test_digest_of_nothing():
+    assert history.digest([]) is None
+
+
+def test_oversized_message_raises():
+    with pytest.raises(history.PromptTooLarge) as error:
+        history.compact(CONTEXT, turns(2), ' '.join(['word'] * 5000), budget=3000)
+    assert error.value.budget == 3000
+    assert error.value.tokens > 3000
+
+
+def test_body_too_large():
+    assert not history.body_too_large({'body': 'x' * 100}, limit=1024)
+    assert history.body_too_large({'body': 'x' * 2000}, limit=1024)
+    # Multi-byte characters count by their UTF-8 size
+    assert history.body_too_large({'body': 'é' * 600}, limit=1024)
+    assert not history.body_too_large({'body': None}, limit=1024)
+
+
+@pytest.fixture
+def api_key(monkeypatch):
+    monkeypatch.setenv('API_GATEWAY_KEY', 'test-key')
+
+
+def chat_request(handler, user_message, chat=()):
+    body = json.dumps({
+        'questionContext': CONTEXT,
+        'chatHistory': list(chat),
+        'userMessage': user_message,
+        'bypassCache': True
+    })
+    event = {'httpMethod': 'POST', 'headers': {'x-api-key': 'test-key'}, 'body': body}
+    return handler.lambda_handler(event, None)
+
+
+@pytest.mark.parametrize('handler', [ContextGPTLambda, GetSingleQuestionLambda])
+def test_prompt_over_budget_is_413(api_key, handler):
+    response = chat_request(handler, ' '.join(['word'] * (history.TOKEN_BUDGET + 100)))
+    assert response['statusCode'] == 413
+    assert 'limit' in json.loads(response['body'])['error']
+
+
+@pytest.mark.parametrize('handler', [ContextGPTLambda, GetSingleQuestionLambda])
+def test_body_over_limit_is_413(api_key, handler):
+    response = chat_request(handler, 'x' * (history.MAX_BODY_BYTES + 1))
+    assert response['statusCode'] == 413
+
+
+@pytest.mark.parametrize('handler', [ContextGPTLambda, GetSingleQuestionLambda])
+@pytest.mark.parametrize('chat', [
+    ['Why not 80?'],
+    [None],
+    [{'role': 'user', 'content': ['Why not 80?']}],
+    [{'role': 'tool', 'content': 'Say B'}]
+])
+def test_malformed_history_is_400(api_key, handler, chat):
+    # Over the budget, so a history that got past validation would be compacted
+    response = chat_request(handler, 'Why?', chat + turns(80))
+    assert response['statusCode'] == 400
+    assert 'chatHistory[0]' in json.loads(response['body'])['error']
+
+
+def test_parse_request_keeps_role_and_content():
+    body = {'chatHistory': [{'role': 'user', 'content': 'Why?', 'id': 7}]}
+    assert history.parse_request(body) == ({}, [{'role': 'user', 'content': 'Why?'}], '')
@@ -0,0 +1,45 @@
+import json
+import pytest
+import GetDrillBatchLambda
+from GetDrillBatchLambda import parse_drills
+
+
+def invoke(body):
+    event = {'httpMethod': 'POST', 'headers': {}, 'body': body}
+    return GetDrillBatchLambda.lambda_handler(event, None)
+
+
+def test_merges_repeated_partitions():
+    counts = parse_drills({'drills': [
+        {'table': 'ports', 'questionType': 'identify_protocol_from_number', 'count': 2},
+        {'table': 'ports', 'questionType': 'identify_protocol_from_number', 'count': 3, 'cursor': 'c'}
+    ]})
+    assert counts == {('ports', 'identify_protocol_from_number'): (5, 'c')}
+
+
+@pytest.mark.parametrize('body', [
+    [],
+    'drills',
+    {'drills': [1]},
+    {'drills': [None]},
+    {'drills': [{'table': ['ports'], 'questionType': 'windows'}]},
+    {'drills': [{'table': 'ports', 'questionType': ['windows']}]},
+    {'drills': [{'table': 'ports', 'questionType': 'windows', 'count': [1]}]},
+    {'drills': [{'table': 'ports', 'questionType': 'windows', 'count': '2'}]},
+    {'drills': [{'table': 'ports', 'questionType': 'windows', 'count': True}]},
+    {'drills': [{'table': 'ports', 'questionType': 'windows', 'count': 0}]},
+    {'drills': [{'table': 'ports', 'questionType': 'windows', 'cursor': 5}]},
+    {'count': [1]},
+    {'table': ['ports']},
+])
+def test_malformed_bodies_are_rejected(body):
+    with pytest.raises(ValueError):
+        parse_drills(body)
+
+    response = invoke(json.dumps(body))
+    assert response['statusCode'] == 400
+    assert 'error' in json.loads(response['body'])
+
+
+def test_invalid_json_is_rejected():
+    assert invoke('{"drills":')['statusCode'] == 400
@@ -0,0 +1,85 @@
+import random
+from collections import Counter
+import pytest
+from conftest import exam_question
+from exam_assembler import BLUEPRINTS, ExamAssembler, domain_quotas, major_domain
+from question_sampler import QuestionSampler
+from question_store import MemoryQuestionStore
+
+PLENTY = 1000
+
+
+@pytest.mark.parametrize('table_name', sorted(BLUEPRINTS))
+@pytest.mark.parametrize('count', [1, 10, 30, 89, 90])
+def test_quotas_follow_the_blueprint(table_name, count):
+    weights = BLUEPRINTS[table_name]
+    quotas = domain_quotas(weights, count, {domain: PLENTY for domain in weights})
+    assert sum(quotas.values()) == count
+    total = sum(weights.values())
+    for domain, weight in weights.items():
+        # Largest remainders: each domain within one of its exact share
+        assert abs(quotas[domain] - count * weight / total) < 1
+
+
+def test_largest_remainders_round_up_the_biggest_fractions():
+    # 90 * (13, 23, 25, 11, 28)% = 11.7, 20.7, 22.5, 9.9, 25.2
+    quotas = domain_quotas(BLUEPRINTS['A1101'], 90, {domain: PLENTY for domain in BLUEPRINTS['A1101']})
+    assert quotas == {'1': 12, '2': 21, '3': 22, '4': 10, '5': 25}
+
+
+def test_short_domain_hands_its_share_to_the_others():
+    quotas = domain_quotas({'1': 50, '2': 50}, 10, {'1': 2, '2': 100})
+    assert quotas == {'1': 2, '2': 8}
+
+
+def test_total_falls_short_only_when_the_bank_does():
+    assert domain_quotas({'1': 50, '2': 50}, 10, {'1': 2, '2': 3}) == {'1': 2, '2': 3}
+    assert domain_quotas({'1': 50, '2': 50}, 10, {}) == {'1': 0, '2': 0}
+
+
+def test_quotas_never_exceed_availability():
+    rng = random.Random(7)
+    for _ in range(500):
+        weights = {str(d): rng.randint(1, 40) for d in range(1, rng.randint(2, 6))}
+        available = {domain: rng.randint(0, 30) for domain in weights}
+        count = rng.randint(0, 120)
+        quotas = domain_quotas(weights, count, available)
+        assert all(0 <= quotas[domain] <= available[domain] for domain in weights)
+        assert sum(quotas.values()) == min(count, sum(available.values()))
+
+
+@pytest.mark.parametrize('value, domain', [('2.3', '2'), (2.3, '2'), ('4', '4'), (None, None), ('', None)])
+def test_major_domain(value, domain):
+    assert major_domain(value) == domain
+
+
+def test_assembled_exam_matches_its_quotas(store):
+    assembler = ExamAssembler(QuestionSampler(store=store))
+    questions = assembler.assemble('Net', 10)
+    assert len({question['id'] for question in questions}) == 10
+    # The fixture has four questions per domain, so Net's blueprint fits
+    expected = domain_quotas(BLUEPRINTS['Net'], 10, {domain: 4 for domain in BLUEPRINTS['Net']})
+    assert Counter(major_domain(question['domain']) for question in questions) == {
+        domain: quota for domain, quota in expected.items() if quota
+    }
+
+
+def test_invalid_items_shortfall_moves_to_other_domains():
+    store = MemoryQuestionStore()
+    items = [exam_question(i, f'{i % 5 + 1}.1') for i in range(100)]
+    # Domain 1 has 20 questions, 16 of them missing their explanations
+    for item in [item for item in items if item['domain'] == '1.1'][:16]:
+        del item['explanation-a']
+    store.put_table('A1101', ['id'], items)
+    assembler = ExamAssembler(QuestionSampler(store=store))
+
+    questions = assembler.assemble('A1101', 90, required_fields=['explanation-a'])
+
+    assert len(questions) == 84
+    assert len({question['id'] for question in questions}) == 84
+    assert all('explanation-a' in question for question in questions)
+
+    # 13% of 60 is 8, but domain 1 only has 4 servable questions
+    questions = assembler.assemble('A1101', 60, required_fields=['explanation-a'])
+    assert len(questions) == 60
+    assert Counter(major_domain(question['domain']) for question in questions)['1'] == 4
@@ -0,0 +1,48 @@
+import json
+import pytest
+import ExamReviewLambda
+import tutor_client
+from ExamReviewLambda import missed_questions
+
+QUESTION = {'id': 'q1', 'question-text': 'Which port?', 'correct answer': 'B'}
+
+
+def invoke(body):
+    event = {'httpMethod': 'POST', 'headers': {'x-api-key': 'test-key'}, 'body': body}
+    return ExamReviewLambda.lambda_handler(event, None)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv('API_GATEWAY_KEY', 'test-key')
+
+
+def test_tutor_pool_serves_every_worker():
+    assert tutor_client.get_client().pool_size >= ExamReviewLambda.WORKERS
+
+
+def test_missed_questions_from_list_and_object_answers():
+    questions = [QUESTION, dict(QUESTION, id='q2'), dict(QUESTION, id='q3')]
+    assert [index for index, _, _ in missed_questions(questions, ['b', 'A'])] == [1, 2]
+    assert [index for index, _, _ in missed_questions(questions, {'0': 'C', '2': 'B'})] == [0, 1]
+
+
+@pytest.mark.parametrize('body', [
+    [],
+    {'questions': {'0': QUESTION}, 'answers': []},
+    {'questions': [QUESTION], 'answers': 'B'},
+    {'questions': [QUESTION], 'answers': [1]},
+    {'questions': [QUESTION], 'answers': {'0': ['B']}},
+    {'questions': ['q1'], 'answers': ['B']},
+    {'questions': [dict(QUESTION, **{'correct answer': 2})], 'answers': ['B']},
+])
+def test_malformed_bodies_are_rejected(body):
+    response = invoke(json.dumps(body))
+    assert response['statusCode'] == 400
+    assert 'error' in json.loads(response['body'])
+
+
+def test_nothing_missed_needs_no_tutor_calls():
+    response = invoke(json.dumps({'questions': [QUESTION], 'answers': ['B']}))
+    assert response['statusCode'] == 200
+    assert json.loads(response['body']) == {'explanations': [], 'pending': []}
@@ -0,0 +1,40 @@
+import json
+import pytest
+import PracticeExamLambda
+
+
+def invoke(query):
+    event = {'httpMethod': 'GET', 'headers': {}, 'queryStringParameters': query}
+    return PracticeExamLambda.lambda_handler(event, None)
+
+
+@pytest.mark.parametrize('exam', ['A1101', 'A1102', 'Net09', 'Sec701', 'Net'])
+def test_serves_requested_count(store, exam):
+    response = invoke({'exam': exam, 'count': '10'})
+    assert response['statusCode'] == 200
+    assert len(json.loads(response['body'])) == 10
+
+
+@pytest.mark.parametrize('query', [
+    {'exam': 'A1101', 'count': '0'},
+    {'exam': 'A1101', 'count': '-5'},
+    {'exam': 'A1101', 'count': 'abc'},
+    {'exam': 'A1101', 'count': str(PracticeExamLambda.MAX_COUNT + 1)},
+    {'count': '10'},
+    {'exam': 'Net10', 'count': '10'},
+    None,
+])
+def test_bad_parameters_are_rejected_without_flushing_the_cache(store, query):
+    invoke({'exam': 'A1101', 'count': '5'})
+    entries = PracticeExamLambda.question_cache.stats()['entries']
+    assert entries
+
+    response = invoke(query)
+    assert response['statusCode'] == 400
+    assert PracticeExamLambda.question_cache.stats()['entries'] == entries
+
+
+def test_empty_bank_is_not_found(store):
+    store.put_table('A1101', ['id'], [])
+    PracticeExamLambda.question_cache.invalidate()
+    assert invoke({'exam': 'A1101', 'count': '5'})['statusCode'] == 404
@@ -0,0 +1,97 @@
+import pytest
+from conftest import drill_question
+import partition_cache
+from partition_cache import PartitionCache
+from question_cursor import FeistelPermutation, advance, decode_cursor, encode_cursor, order_tag
+from question_store import MemoryQuestionStore
+
+KEY_NAMES = ['question-type', 'question-id']
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 16, 17, 100, 1000, 4097])
+def test_permutation_covers_the_range_once(size):
+    permutation = FeistelPermutation(size, seed=12345)
+    assert sorted(permutation[i] for i in range(size)) == list(range(size))
+
+
+def test_permutation_depends_on_the_seed():
+    first = [FeistelPermutation(100, 1)[i] for i in range(100)]
+    second = [FeistelPermutation(100, 2)[i] for i in range(100)]
+    assert first != second
+    assert first == [FeistelPermutation(100, 1)[i] for i in range(100)]
+
+
+@pytest.mark.parametrize('position', [-1, 10])
+def test_permutation_rejects_positions_outside_the_range(position):
+    with pytest.raises(IndexError):
+        FeistelPermutation(10, 1)[position]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(0xdeadbeef, 42, 1000, 7)) == (0xdeadbeef, 42, 1000, 7)
+
+
+@pytest.mark.parametrize('cursor', ['', 'abc', '1-2-3', '1-2-3-4-5', 'w-x-y-z', None, 5])
+def test_malformed_cursor_decodes_to_none(cursor):
+    assert decode_cursor(cursor) is None
+
+
+@pytest.mark.parametrize('size, count', [(10, 1), (10, 3), (10, 10), (37, 4)])
+def test_cursor_serves_every_position_before_repeating(size, count):
+    cursor, served = None, []
+    while len(served) < size:
+        positions, cursor = advance(cursor, size, count)
+        assert len(positions) == min(count, size)
+        served.extend(positions)
+    # The last batch may start the next cycle
+    assert sorted(served[:size]) == list(range(size))
+
+
+def test_batch_across_a_cycle_boundary_has_no_repeats():
+    positions, cursor = advance(None, 5, 4)
+    positions, cursor = advance(cursor, 5, 4)
+    assert len(set(positions)) == 4
+
+
+def test_cursor_for_another_size_starts_over():
+    _, cursor = advance(None, 10, 9)
+    positions, cursor = advance(cursor, 20, 20)
+    assert sorted(positions) == list(range(20))
+    assert decode_cursor(cursor)[1:3] == (20, 20)
+
+
+def test_cursor_for_another_order_starts_over():
+    first, second = order_tag([(1,), (2,), (3,)]), order_tag([(1,), (3,), (2,)])
+    assert first != second
+    _, cursor = advance(None, 3, 2, first)
+    positions, cursor = advance(cursor, 3, 3, second)
+    assert sorted(positions) == [0, 1, 2]
+    assert decode_cursor(cursor)[1:] == (3, 3, second)
+
+
+def test_partition_reload_in_another_order_restarts_the_cursor(monkeypatch):
+    store = MemoryQuestionStore()
+    monkeypatch.setattr(partition_cache, 'get_store', lambda: store)
+    partitions = PartitionCache()
+    store.put_table('Commands', KEY_NAMES, [drill_question(i, 'windows') for i in [1, 2, 10]])
+
+    questions, cursor = partitions.next_unseen('Commands', 'windows', None, 2)
+    assert [q['question-id'] for q in partitions.items('Commands', 'windows')] == [1, 2, 10]
+    assert decode_cursor(cursor)[1] == 2
+
+    # The table is reloaded with a question inserted between the others
+    store.put_table('Commands', KEY_NAMES, [drill_question(i, 'windows') for i in [1, 2, 3]])
+    partitions.cache.invalidate()
+    questions, cursor = partitions.next_unseen('Commands', 'windows', cursor, 3)
+    assert sorted(q['question-id'] for q in questions) == [1, 2, 3]
+    # A fresh permutation, not the tail of the old one plus a new cycle
+    assert decode_cursor(cursor)[1] == 3
+
+
+def test_empty_range():
+    assert advance(None, 0, 5) == ([], None)
+
+
+def test_count_is_capped_at_the_range():
+    positions, _ = advance(None, 3, 10)
+    assert sorted(positions) == [0, 1, 2]
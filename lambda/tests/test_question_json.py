@@ -0,0 +1,35 @@
+import json
+import pytest
+from question_json import Question, dumps_questions
+
+MUTATIONS = {
+    'setitem': lambda q: q.__setitem__('option-a', 'Z'),
+    'delitem': lambda q: q.__delitem__('option-a'),
+    'update': lambda q: q.update({'option-a': 'Z'}),
+    'ior': lambda q: q.__ior__({'option-a': 'Z'}),
+    'setdefault': lambda q: q.setdefault('explanation', 'new'),
+    'pop': lambda q: q.pop('option-a'),
+    'popitem': lambda q: q.popitem(),
+    'clear': lambda q: q.clear()
+}
+
+
+@pytest.mark.parametrize('mutation', sorted(MUTATIONS))
+def test_mutation_refreshes_the_cached_fragment(mutation):
+    question = Question.from_fragment('{"question-text":"Q?","option-a":"A"}')
+    MUTATIONS[mutation](question)
+    assert json.loads(question.fragment) == dict(question)
+
+
+def test_lookups_keep_the_cached_fragment():
+    fragment = '{"question-text":"Q?","option-a":"A"}'
+    question = Question.from_fragment(fragment)
+    question.setdefault('option-a', 'Z')
+    question.pop('missing', None)
+    question['option-a'] = 'A'
+    assert question.fragment is fragment
+
+
+def test_dumps_questions_joins_fragments():
+    questions = [Question({'id': 1}), {'id': 2}]
+    assert json.loads(dumps_questions(questions)) == [{'id': 1}, {'id': 2}]
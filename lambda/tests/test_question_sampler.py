@@ -0,0 +1,38 @@
+import question_snapshot
+from question_sampler import QuestionSampler
+from question_store import MemoryQuestionStore
+
+ITEM = {'id': 'q1', 'question-text': 'Original?', 'correct answer': 'A'}
+
+
+def test_stale_snapshot_is_not_served(tmp_path, monkeypatch):
+    monkeypatch.setenv('QUESTION_BANK_VERSION', '1')
+    path = str(tmp_path / 'Stale.qsnap')
+    question_snapshot.write_snapshot(path, 'Stale', ['id'], [ITEM], version='1')
+    monkeypatch.setitem(question_snapshot._snapshots, 'Stale', question_snapshot.QuestionSnapshot(path))
+
+    store = MemoryQuestionStore()
+    store.put_table('Stale', ['id'], [dict(ITEM, **{'question-text': 'Edited?'})])
+    sampler = QuestionSampler(store=store)
+
+    # Current snapshot: served without reading the store
+    [question] = sampler.sample('Stale', 1)
+    assert question['question-text'] == 'Original?'
+
+    # The table was edited and the bank version bumped
+    monkeypatch.setenv('QUESTION_BANK_VERSION', '2')
+    [question] = sampler.sample('Stale', 1)
+    assert question['question-text'] == 'Edited?'
+    [question] = sampler.fetch('Stale', [{'id': 'q1'}])
+    assert question['question-text'] == 'Edited?'
+
+
+def test_snapshot_partition_is_in_numeric_sort_key_order(tmp_path):
+    path = str(tmp_path / 'Commands.qsnap')
+    items = [{'question-type': 'windows', 'question-id': i} for i in [10, 2, 1, 11]]
+    question_snapshot.write_snapshot(path, 'Commands', ['question-type', 'question-id'], items, version='1')
+    snapshot = question_snapshot.QuestionSnapshot(path)
+
+    ids = [snapshot.question(i)['question-id'] for i in snapshot.partition('windows')]
+
+    assert ids == [1, 2, 10, 11]
@@ -0,0 +1,44 @@
+import pytest
+from conftest import drill_question
+from question_store import MemoryQuestionStore, SQLiteQuestionStore, is_missing_index
+
+KEY_NAMES = ['question-type', 'question-id']
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def bank(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryQuestionStore()
+    return SQLiteQuestionStore(str(tmp_path / 'questions.db'))
+
+
+def test_partition_is_in_numeric_sort_key_order(bank):
+    # Inserted shuffled; DynamoDB returns Number sort keys by value
+    bank.put_table('Commands', KEY_NAMES, [drill_question(i, 'windows') for i in [10, 2, 1, 11, 3, 20]])
+
+    ids = [item['question-id'] for item in bank.query_by_type('Commands', 'windows')]
+
+    assert ids == [1, 2, 3, 10, 11, 20]
+
+
+def test_keys_by_domain_are_in_key_order(bank):
+    items = [{'id': i, 'domain': '1.1'} for i in [12, 3, 100]] + [{'id': 7, 'domain': '1.10'}]
+    bank.put_table('Sec', ['id'], items)
+
+    assert bank.keys_by_domain('Sec', '1.1') == [{'id': 3}, {'id': 12}, {'id': 100}]
+    assert bank.keys_by_domain('Sec', '1.10') == [{'id': 7}]
+
+
+class FakeClientError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.response = {'Error': {'Code': code, 'Message': message}}
+
+
+@pytest.mark.parametrize('code, message, missing', [
+    ('ValidationException', 'The table does not have the specified index: domain-index', True),
+    ('ValidationException', 'Query condition missed key schema element', False),
+    ('ResourceNotFoundException', 'Requested resource not found', False)
+])
+def test_missing_domain_index_is_recognized(code, message, missing):
+    assert is_missing_index(FakeClientError(code, message)) is missing
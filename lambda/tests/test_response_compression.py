@@ -0,0 +1,76 @@
+import base64
+import gzip
+import json
+import pytest
+import GetDrillBatchLambda
+from response_compression import choose_encoding, compressed, decode_request
+
+
+def echo_handler(body_size):
+    @compressed
+    def handler(event, context):
+        return {'statusCode': 200, 'headers': {}, 'body': event['body'] or 'x' * body_size}
+    return handler
+
+
+@pytest.mark.parametrize('header, encoding', [
+    ('gzip, deflate', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('*', 'gzip'),
+    (None, None),
+])
+def test_choose_encoding(header, encoding, monkeypatch):
+    monkeypatch.setattr('response_compression.brotli', None)
+    assert choose_encoding(header) == encoding
+
+
+def test_large_body_is_compressed(monkeypatch):
+    monkeypatch.setattr('response_compression.brotli', None)
+    event = {'headers': {'Accept-Encoding': 'gzip'}, 'body': None}
+    response = echo_handler(4096)(event, None)
+    assert response['isBase64Encoded'] is True
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert response['headers']['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(base64.b64decode(response['body'])) == b'x' * 4096
+
+
+def test_small_body_is_left_alone():
+    event = {'headers': {'Accept-Encoding': 'gzip'}, 'body': None}
+    response = echo_handler(10)(event, None)
+    assert response['body'] == 'x' * 10
+    assert 'Content-Encoding' not in response['headers']
+    assert 'Vary' not in response['headers']
+
+
+@pytest.mark.parametrize('header', [None, 'identity', 'gzip;q=0'])
+def test_large_uncompressed_body_varies_on_accept_encoding(header):
+    event = {'headers': {'Accept-Encoding': header} if header else {}, 'body': None}
+    response = echo_handler(4096)(event, None)
+    assert response['body'] == 'x' * 4096
+    assert 'Content-Encoding' not in response['headers']
+    assert response['headers']['Vary'] == 'Accept-Encoding'
+
+
+def test_base64_request_body_is_decoded():
+    body = json.dumps({'userMessage': 'héllo'})
+    event = {'headers': {}, 'body': base64.b64encode(body.encode('utf-8')).decode('ascii'), 'isBase64Encoded': True}
+    assert echo_handler(0)(event, None)['body'] == body
+
+
+def test_undecodable_request_body_is_passed_through():
+    event = {'body': 'not base64!', 'isBase64Encoded': True}
+    assert decode_request(event) is event
+
+
+def test_post_handler_reads_base64_body(store):
+    body = json.dumps({'drills': [{'table': 'ports', 'questionType': 'identify_protocol_from_number'}]})
+    event = {
+        'httpMethod': 'POST',
+        'headers': {},
+        'body': base64.b64encode(body.encode('utf-8')).decode('ascii'),
+        'isBase64Encoded': True
+    }
+    response = GetDrillBatchLambda.lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    assert [drill['table'] for drill in json.loads(response['body'])['drills']] == ['ports']
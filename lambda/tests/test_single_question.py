@@ -0,0 +1,67 @@
+import json
+from decimal import Decimal
+import pytest
+from domain_index import DomainIndex
+import GetSingleQuestionLambda
+from question_sampler import QuestionSampler
+import question_snapshot
+from question_store import MemoryQuestionStore
+
+
+def invoke(method, query, body=None):
+    event = {
+        'httpMethod': method,
+        'headers': {'x-api-key': 'test-key'},
+        'queryStringParameters': query,
+        'body': body
+    }
+    return GetSingleQuestionLambda.lambda_handler(event, None)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv('API_GATEWAY_KEY', 'test-key')
+
+
+@pytest.mark.parametrize('method', ['GET', 'POST'])
+@pytest.mark.parametrize('exam', ['A1101', 'A1102', 'Net09', 'Sec701'])
+def test_serves_a_question_of_the_domain(store, method, exam):
+    response = invoke(method, {'exam': exam, 'domain': '2.3', 'count': '1'})
+    assert response['statusCode'] == 200
+    [question] = json.loads(response['body'])
+    assert question['domain'] == '2.3'
+    assert response['headers']['X-Question-Cursor']
+
+
+def test_cursor_covers_the_domain_without_repeats(store):
+    expected = [item['id'] for item in store.scan_exam('A1101') if item['domain'] == '1.1']
+    seen, cursor = [], None
+    for _ in expected:
+        query = {'exam': 'A1101', 'domain': '1.1'}
+        if cursor:
+            query['cursor'] = cursor
+        response = invoke('GET', query)
+        cursor = response['headers']['X-Question-Cursor']
+        seen.extend(question['id'] for question in json.loads(response['body']))
+    assert sorted(seen) == sorted(expected)
+
+
+@pytest.mark.parametrize('query, status', [
+    ({'exam': 'Net10', 'domain': '1.1'}, 400),
+    ({'exam': 'A1101'}, 400),
+    ({'exam': 'A1101', 'domain': '9.9'}, 404),
+])
+def test_bad_lookups(store, query, status):
+    assert invoke('GET', query)['statusCode'] == status
+
+
+def test_snapshot_domain_matches_the_raw_objective(tmp_path, monkeypatch):
+    monkeypatch.setenv('QUESTION_BANK_VERSION', '1')
+    items = [{'id': i, 'domain': Decimal('1.10')} for i in [12, 3]] + [{'id': 5, 'domain': Decimal('1.1')}]
+    path = str(tmp_path / 'Objectives.qsnap')
+    question_snapshot.write_snapshot(path, 'Objectives', ['id'], items, version='1')
+    monkeypatch.setitem(question_snapshot._snapshots, 'Objectives', question_snapshot.QuestionSnapshot(path))
+    index = DomainIndex(QuestionSampler(store=MemoryQuestionStore()))
+
+    assert index.keys('Objectives', '1.10') == [(3,), (12,)]
+    assert index.keys('Objectives', '1.1') == [(5,)]
@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(LAMBDA_DIR, 'benchmarks'))
+# urllib3 is vendored into the ContextGPT bundle
+sys.path.append(os.path.join(os.path.dirname(LAMBDA_DIR), 'contextgpt_lambda'))
+
+from openai_stub import OpenAIStub
+import tutor_client
+
+
+@pytest.fixture
+def stub():
+    server = OpenAIStub(latency_ms=2)
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_warm_connection_is_reused(stub):
+    client = tutor_client.TutorClient(stub.url, api_key='test', pool_size=2)
+    client.warm()
+    pool = client.pool()
+    assert client.post({'messages': []}).status == 200
+    assert pool.num_connections == 1
+
+
+def test_reset_does_not_break_calls_in_flight(stub):
+    client = tutor_client.TutorClient(stub.url, api_key='test', pool_size=4)
+    done = threading.Event()
+
+    def reset_repeatedly():
+        while not done.is_set():
+            client.reset()
+
+    resetter = threading.Thread(target=reset_repeatedly)
+    resetter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            statuses = list(pool.map(lambda _: client.post({'messages': []}).status, range(100)))
+    finally:
+        done.set()
+        resetter.join()
+    assert statuses == [200] * 100
+
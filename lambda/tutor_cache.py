@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import aws_clients
+from question_cache import ItemCache
+import telemetry
+import tutor_prompt
+
+# Set to false to turn the cache off
+ENABLED = os.environ.get('TUTOR_CACHE_ENABLED', 'true').lower() != 'false'
+# Bump to drop every cached answer, e.g. after changing the prompt
+CACHE_VERSION = os.environ.get('TUTOR_CACHE_VERSION', '0')
+# In-container tier
+LOCAL_TTL = int(os.environ.get('TUTOR_CACHE_TTL', 3600))
+LOCAL_MAX_ITEMS = int(os.environ.get('TUTOR_CACHE_MAX_ITEMS', 2000))
+# Shared tier: 'dynamodb' (table TUTOR_CACHE_TABLE), 'memory', or unset for none
+SHARED_BACKEND = os.environ.get('TUTOR_CACHE_STORE', '')
+SHARED_TABLE = os.environ.get('TUTOR_CACHE_TABLE', 'TutorResponses')
+SHARED_TTL = int(os.environ.get('TUTOR_CACHE_SHARED_TTL', 7 * 24 * 3600))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_message(text):
+    """
+    'Why is  B wrong?' -> 'why is b wrong', so trivially different
+    phrasings of the same question share an entry
+    """
+    return _WHITESPACE.sub(' ', (text or '').lower()).strip(' ?!.')
+
+
+def history_digest(chat_history):
+    turns = [[turn.get('role'), normalize_message(turn.get('content'))] for turn in chat_history or []]
+    return hashlib.sha256(json.dumps(turns).encode('utf-8')).hexdigest()
+
+
+def cache_key(question_context, user_message, chat_history):
+    """
+    Hash of everything that shapes the completion: the question fields the
+    prompt uses, the normalized user message, the history digest and the
+    model settings
+    """
+    context = {field: (question_context or {}).get(field) for field in tutor_prompt.CONTEXT_FIELDS}
+    material = json.dumps([
+        CACHE_VERSION,
+        tutor_prompt.MODEL,
+        tutor_prompt.MAX_TOKENS,
+        context,
+        normalize_message(user_message),
+        history_digest(chat_history)
+    ], sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class SharedTier:
+    """
+    Answer store shared by every container
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def put(self, key, response, ttl=SHARED_TTL):
+        """
+        Store response under key; ttl=None keeps it until overwritten
+        """
+        raise NotImplementedError
+
+
+class DynamoSharedTier(SharedTier):
+    """
+    Items {cacheKey, response, expiresAt}. Enable DynamoDB TTL on
+    expiresAt; reads also check it because TTL deletes lazily.
+    """
+
+    def __init__(self, table_name=SHARED_TABLE):
+        self.table_name = table_name
+
+    def get(self, key):
+        item = aws_clients.table(self.table_name).get_item(Key={'cacheKey': key}).get('Item')
+        if not item or ('expiresAt' in item and int(item['expiresAt']) < time.time()):
+            return None
+        return item['response']
+
+    def put(self, key, response, ttl=SHARED_TTL):
+        item = {'cacheKey': key, 'response': response}
+        if ttl is not None:
+            item['expiresAt'] = int(time.time() + ttl)
+        aws_clients.table(self.table_name).put_item(Item=item)
+
+
+class MemorySharedTier(SharedTier):
+    """
+    Process-local stand-in for the shared tier, for local runs and tests
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.time()):
+            return None
+        return entry[0]
+
+    def put(self, key, response, ttl=SHARED_TTL):
+        with self._lock:
+            self._items[key] = (response, None if ttl is None else time.time() + ttl)
+
+
+class TutorCache:
+    """
+    Two-tier cache of tutor answers: a bounded in-container LRU in front of
+    an optional shared tier. Shared hits are copied into the local tier.
+    A failing shared tier is logged and treated as a miss, never as a
+    failed request.
+    """
+
+    def __init__(self, shared=None, max_items=LOCAL_MAX_ITEMS, ttl=LOCAL_TTL):
+        self.local = ItemCache(max_items=max_items, ttl=ttl, version_fn=lambda: CACHE_VERSION)
+        self.shared = shared
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        (response, tier) where tier is 'local', 'shared' or None on a miss
+        """
+        found = self.local.get_many([key])
+        if key in found:
+            self._count('local')
+            return found[key], 'local'
+
+        if self.shared is not None:
+            try:
+                response = self.shared.get(key)
+            except Exception as e:
+                telemetry.logger.warning("Tutor cache read failed: %s", e)
+                response = None
+            if response is not None:
+                self.local.put_many([(key, response)])
+                self._count('shared')
+                return response, 'shared'
+
+        self._count(None)
+        return None, None
+
+    def put(self, key, response):
+        self.local.put_many([(key, response)])
+        if self.shared is not None:
+            try:
+                self.shared.put(key, response)
+            except Exception as e:
+                telemetry.logger.warning("Tutor cache write failed: %s", e)
+
+    def _count(self, tier):
+        with self._lock:
+            if tier == 'local':
+                self.local_hits += 1
+            elif tier == 'shared':
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        hits = self.local_hits + self.shared_hits
+        total = hits + self.misses
+        return {
+            'localHits': self.local_hits,
+            'sharedHits': self.shared_hits,
+            'misses': self.misses,
+            'hitRate': round(hits / total, 4) if total else 0.0
+        }
+
+
+def shared_tier():
+    """
+    Shared tier selected by TUTOR_CACHE_STORE
+    """
+    if SHARED_BACKEND == 'dynamodb':
+        return DynamoSharedTier()
+    if SHARED_BACKEND == 'memory':
+        return MemorySharedTier()
+    if SHARED_BACKEND:
+        raise ValueError(f"Unknown TUTOR_CACHE_STORE backend: {SHARED_BACKEND}")
+    return None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    The container's tutor cache, or None when TUTOR_CACHE_ENABLED is false
+    """
+    global _cache
+    if not ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TutorCache(shared_tier())
+        return _cache
+
+
+def set_cache(cache):
+    """
+    Replace the container's tutor cache, e.g. with one whose shared tier is
+    a pre-filled MemorySharedTier
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,358 @@
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import deadline
+from lazy_imports import lazy_module
+import telemetry
+
+urllib3 = lazy_module('urllib3')
+
+# OpenAI-compatible chat completions endpoint
+OPENAI_API_URL = os.environ.get('OPENAI_API_URL', 'https://api.openai.com/v1/chat/completions')
+CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 2))
+READ_TIMEOUT = float(os.environ.get('OPENAI_READ_TIMEOUT', 30))
+# Concurrent tutor calls the container's pool serves without opening
+# extra connections; handlers that fan out raise it with reserve()
+POOL_SIZE = int(os.environ.get('OPENAI_POOL_SIZE', 4))
+# Connections idle for longer are assumed closed by the server or load
+# balancer, and the pool is rebuilt instead of failing on a dead socket
+MAX_IDLE_SECONDS = float(os.environ.get('OPENAI_MAX_IDLE_SECONDS', 60))
+# Open the connection during the Lambda init phase
+PREWARM = os.environ.get('TUTOR_PREWARM', 'true').lower() != 'false'
+# Retries of connection errors, timeouts and RETRY_STATUSES answers, with
+# full-jitter exponential backoff unless the answer carries Retry-After
+RETRY_ATTEMPTS = int(os.environ.get('OPENAI_RETRY_ATTEMPTS', 2))
+RETRY_BACKOFF_BASE = float(os.environ.get('OPENAI_RETRY_BACKOFF_BASE', 0.25))
+RETRY_BACKOFF_MAX = float(os.environ.get('OPENAI_RETRY_BACKOFF_MAX', 4))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Hedged requests: once a completion has run past the HEDGE_QUANTILE of
+# recent latencies, an identical second request goes out and the first
+# answer wins. Off by default, since a hedge can double the token bill.
+HEDGE = os.environ.get('OPENAI_HEDGE', 'false').lower() == 'true'
+HEDGE_QUANTILE = float(os.environ.get('OPENAI_HEDGE_QUANTILE', 0.95))
+# Completions timed before the quantile is trusted, and how many are kept
+HEDGE_MIN_SAMPLES = int(os.environ.get('OPENAI_HEDGE_MIN_SAMPLES', 20))
+LATENCY_WINDOW = 200
+
+
+class UpstreamError(Exception):
+    """
+    Non-200 answer from the completions API
+    """
+
+    def __init__(self, status, body):
+        super().__init__(f"OpenAI API error {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+_retry_class = None
+
+
+def retry_policy():
+    """
+    Fresh urllib3 Retry for one request. The subclass is built on first
+    use so urllib3 stays out of the cold start.
+    """
+    global _retry_class
+    if _retry_class is None:
+        class JitteredRetry(urllib3.Retry):
+            def get_backoff_time(self):
+                # Full jitter: anywhere between 0 and the exponential step
+                step = self.backoff_factor * 2 ** max(0, len(self.history) - 1)
+                return random.uniform(0, min(self.backoff_max, step))
+
+            def sleep(self, response=None):
+                wait = self.get_retry_after(response) if response is not None else None
+                if wait is None:
+                    wait = self.get_backoff_time()
+                # No waiting for a retry the invocation can't afford
+                deadline.check(wait * 1000 + deadline.MIN_CALL_MS)
+                time.sleep(wait)
+
+        _retry_class = JitteredRetry
+
+    return _retry_class(
+        total=RETRY_ATTEMPTS,
+        redirect=False,
+        other=0,
+        allowed_methods=frozenset({'POST'}),
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=RETRY_BACKOFF_BASE,
+        backoff_max=RETRY_BACKOFF_MAX,
+        raise_on_status=False,
+        respect_retry_after_header=True
+    )
+
+
+class LatencyWindow:
+    """
+    Latencies of the last LATENCY_WINDOW successful completions
+    """
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q):
+        """
+        The q quantile in seconds, or None with fewer than
+        HEDGE_MIN_SAMPLES samples
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+class TutorClient:
+    """
+    Container-scoped HTTPS connection pool to the chat completions API.
+
+    Connections are kept alive across warm invocations, so a chat turn
+    skips DNS, TCP and TLS setup. urllib3 drops pooled connections the
+    server has closed before reusing them. A connection that dies while
+    the container is frozen is caught by the idle check, or by one retry
+    on a fresh connection.
+    """
+
+    def __init__(self, url=OPENAI_API_URL, api_key=None, pool_size=POOL_SIZE):
+        self.url = url
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        self.pool_size = pool_size
+        self._pool = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.latencies = LatencyWindow()
+        self._hedge_pool = None
+
+    def connections(self):
+        """
+        Connections kept open: one per concurrent caller, or two with
+        hedging, since a hedged call holds a second connection
+        """
+        return self.pool_size * 2 if HEDGE else self.pool_size
+
+    def _new_pool(self):
+        return urllib3.connection_from_url(
+            self.url,
+            maxsize=self.connections(),
+            block=False,
+            timeout=urllib3.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT),
+            retries=False
+        )
+
+    def pool(self):
+        """
+        The live pool, replaced when it has sat idle past MAX_IDLE_SECONDS.
+        A replaced pool is never closed under its callers: calls holding it
+        finish on it, and urllib3 closes its connections once it is no
+        longer referenced.
+        """
+        with self._lock:
+            # Wall clock, because the monotonic clock can stand still while
+            # the container is frozen
+            now = time.time()
+            if self._pool is not None and now - self._last_used > MAX_IDLE_SECONDS:
+                self._pool = None
+            if self._pool is None:
+                self._pool = self._new_pool()
+            self._last_used = now
+            return self._pool
+
+    def reserve(self, callers):
+        """
+        Grow the pool and the hedge workers to serve callers concurrent
+        posts. Calls already holding the old pool finish on it.
+        """
+        with self._lock:
+            if callers <= self.pool_size:
+                return
+            self.pool_size = callers
+            self._pool = None
+            hedge_pool, self._hedge_pool = self._hedge_pool, None
+        if hedge_pool is not None:
+            hedge_pool.shutdown(wait=False)
+
+    def reset(self):
+        """
+        Drop the pool so the next call builds a fresh one, without closing
+        connections other threads are using
+        """
+        with self._lock:
+            self._pool = None
+
+    def warm(self):
+        """
+        Open one connection (DNS, TCP and TLS) with a HEAD request to the
+        endpoint. Whatever it answers, the kept-alive connection goes back
+        to the pool.
+        """
+        path = urllib3.util.parse_url(self.url).request_uri
+        self.pool().urlopen(
+            'HEAD', path, timeout=urllib3.Timeout(connect=CONNECT_TIMEOUT, read=CONNECT_TIMEOUT), retries=False
+        )
+
+    def headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _timeout(self):
+        """
+        Connect and read timeouts, cut down to the invocation's deadline
+        """
+        return urllib3.Timeout(connect=deadline.bound(CONNECT_TIMEOUT), read=deadline.bound(READ_TIMEOUT))
+
+    def _urlopen(self, payload, **kwargs):
+        """
+        POST payload as JSON under retry_policy(). Every attempt gets
+        timeouts cut to the deadline, and a pooled connection found dead is
+        replaced by a fresh pool before the retry.
+        """
+        body = json.dumps(payload).encode('utf-8')
+        path = urllib3.util.parse_url(self.url).request_uri
+        retry = retry_policy()
+        while True:
+            try:
+                response = self.pool().urlopen(
+                    'POST', path, body=body, headers=self.headers(), timeout=self._timeout(), retries=False, **kwargs
+                )
+            except (urllib3.exceptions.TimeoutError, urllib3.exceptions.ProtocolError) as e:
+                if isinstance(e, urllib3.exceptions.TimeoutError):
+                    raise_if_deadline(e)
+                retry = next_retry(retry, path, error=e)
+                if retry is None:
+                    raise
+                if isinstance(e, urllib3.exceptions.ProtocolError):
+                    # A dead keep-alive connection; reconnect straight away
+                    telemetry.logger.info("Tutor connection dropped, reconnecting")
+                    self.reset()
+                else:
+                    retry.sleep()
+                telemetry.count('TutorRetries')
+                continue
+
+            if not retry.is_retry('POST', response.status, 'Retry-After' in response.headers):
+                return response
+            retry = next_retry(retry, path, response=response)
+            if retry is None:
+                return response
+            telemetry.logger.info("Tutor call answered %s, retrying", response.status)
+            response.drain_conn()
+            response.release_conn()
+            retry.sleep(response)
+            telemetry.count('TutorRetries')
+
+    def _timed_post(self, payload):
+        start = time.perf_counter()
+        response = self._urlopen(payload)
+        if response.status == 200:
+            self.latencies.add(time.perf_counter() - start)
+        return response
+
+    def post(self, payload):
+        """
+        The urllib3 response to payload, with its body read. With HEDGE on,
+        a second request goes out once the first has taken longer than the
+        recent HEDGE_QUANTILE latency, and the first 200 answer is returned.
+        """
+        delay = self.latencies.quantile(HEDGE_QUANTILE) if HEDGE else None
+        if delay is None:
+            return self._timed_post(payload)
+
+        executor = self._hedge_executor()
+        # Copies carry the invocation's deadline and telemetry into the workers
+        first = executor.submit(contextvars.copy_context().run, self._timed_post, payload)
+        done, _ = wait([first], timeout=delay)
+        if done or deadline.expired():
+            return first.result()
+
+        telemetry.count('TutorHedged')
+        second = executor.submit(contextvars.copy_context().run, self._timed_post, payload)
+        pending = {first, second}
+        fallback, error = None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if response.status == 200:
+                    # The loser finishes in the background and returns its
+                    # connection to the pool
+                    return response
+                fallback = response
+        if fallback is not None:
+            return fallback
+        raise error
+
+    def _hedge_executor(self):
+        # A hedged post runs on up to two workers
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.pool_size * 2)
+            return self._hedge_pool
+
+
+def next_retry(retry, path, response=None, error=None):
+    """
+    retry after one more failed attempt, or None once it is used up
+    """
+    try:
+        return retry.increment('POST', path, response=response, error=error)
+    except urllib3.exceptions.MaxRetryError:
+        return None
+
+
+def raise_if_deadline(error):
+    """
+    Report a timeout that the deadline cut short as DeadlineExceeded
+    """
+    if deadline.expired():
+        raise deadline.DeadlineExceeded(f"Tutor call timed out: {error}") from error
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TutorClient()
+        return _client
+
+
+def reserve(callers):
+    """
+    Size the container's client for callers concurrent posts
+    """
+    get_client().reserve(callers)
+
+
+def prewarm():
+    """
+    Connect during init when TUTOR_PREWARM allows it. Failures are logged
+    and left for the first request to retry.
+    """
+    if not PREWARM:
+        return
+    try:
+        get_client().warm()
+    except Exception as e:
+        telemetry.logger.warning("Tutor connection warmup failed: %s", e)
@@ -0,0 +1,69 @@
+MODEL = 'gpt-3.5-turbo'
+TEMPERATURE = 0.7
+MAX_TOKENS = 150
+
+# questionContext fields the system prompt is built from
+CONTEXT_FIELDS = (
+    'question_text',
+    'option_a',
+    'option_b',
+    'option_c',
+    'option_d',
+    'selected_answer',
+    'correct_answer'
+)
+
+# Opening questions the chat suggests; their answers are pregenerated
+OPENING_MESSAGES = ('How is that wrong?', "I don't get the question")
+
+
+def system_prompt(question_context):
+    """
+    Tutor instructions with the question the user is working on
+    """
+    return (
+        f"You are a helpful AI tutor. Use the following question context to help the user understand the topic better: "
+        f"Question: {question_context.get('question_text')}\n"
+        f"Options:\nA) {question_context.get('option_a')}\n"
+        f"B) {question_context.get('option_b')}\n"
+        f"C) {question_context.get('option_c')}\n"
+        f"D) {question_context.get('option_d')}\n"
+        f"User selected: {question_context.get('selected_answer')}\n"
+        f"Correct answer: {question_context.get('correct_answer')}"
+    )
+
+
+def build_messages(question_context, chat_history, user_message):
+    """
+    Chat completion messages: system prompt, earlier turns, then the new
+    user message
+    """
+    messages = [{"role": "system", "content": system_prompt(question_context)}]
+    messages.extend(chat_history)
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def completion_request(messages):
+    return {
+        "model": MODEL,
+        "messages": messages,
+        "temperature": TEMPERATURE,
+        "max_tokens": MAX_TOKENS
+    }
+
+
+def question_context(question, selected_answer):
+    """
+    questionContext for a stored question, built the way the frontend
+    builds it from the question it shows
+    """
+    return {
+        'question_text': question.get('question-text'),
+        'option_a': question.get('option-a'),
+        'option_b': question.get('option-b'),
+        'option_c': question.get('option-c'),
+        'option_d': question.get('option-d'),
+        'selected_answer': selected_answer or 'No answer yet',
+        'correct_answer': question.get('correct answer')
+    }